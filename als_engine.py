@@ -0,0 +1,611 @@
+"""
+Recommender-System auf Basis von Alternating Least Squares (ALS) für große, dünn besetzte Bewertungsmatrizen
+
+Anders als in als-recommender.py wird die Empfehlungsmatrix R nicht als dichte
+Matrix mit np.nan für fehlende Bewertungen gespeichert. Stattdessen werden nur
+die beobachteten Bewertungen als Tripel (Buch, Nutzende, Bewertung) abgelegt und
+in zwei komprimierte Indexstrukturen überführt:
+- CSR (Compressed Sparse Row): je Buch die Nutzenden, die es bewertet haben
+- CSC (Compressed Sparse Column): je Nutzende die Bücher, die sie bewertet haben
+Der Speicherbedarf wächst damit mit der Anzahl der Bewertungen und nicht mit
+dem Produkt aus Anzahl der Bücher und Anzahl der Nutzenden.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from time import perf_counter
+
+import numpy as np
+from numpy.linalg import solve
+
+
+def _compress(rows, cols, values, num_rows):
+    """
+    Sorts the triplets by row and returns the compressed arrays (indptr, indices, data).
+    The entries of row i are indices[indptr[i]:indptr[i + 1]].
+    """
+    order = np.argsort(rows, kind='stable')
+    indptr = np.zeros(num_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_rows), out=indptr[1:])
+    return indptr, cols[order], values[order]
+
+
+def _deduplicate(rows, cols, values, num_cols, duplicates='last'):
+    """
+    Keeps only the last rating of every (row, col) pair,
+    or with duplicates='sum' the sum of all its ratings (e.g. number of loans).
+    """
+    keys = rows.astype(np.int64) * num_cols + cols
+    if duplicates == 'sum':
+        unique_keys, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        return rows[first], cols[first], np.bincount(inverse, weights=values, minlength=unique_keys.size)
+    _, last = np.unique(keys[::-1], return_index=True)
+    keep = np.sort(rows.size - 1 - last)
+    return rows[keep], cols[keep], values[keep]
+
+
+class SparseRatings:
+    """
+    Observed entries of the books × users rating matrix R,
+    stored both row-wise (CSR, per book) and column-wise (CSC, per user).
+    Repeated (book, user) pairs keep the last rating (duplicates='last')
+    or are added up (duplicates='sum', for implicit feedback like loans).
+    """
+
+    def __init__(self, books, users, ratings, num_books=None, num_users=None, duplicates='last'):
+        books = np.asarray(books, dtype=np.int32)
+        users = np.asarray(users, dtype=np.int32)
+        ratings = np.asarray(ratings, dtype=np.float64)
+        if not (books.shape == users.shape == ratings.shape):
+            raise ValueError("books, users and ratings must have the same length")
+        if num_books is None:
+            num_books = int(books.max()) + 1 if books.size else 0
+        if num_users is None:
+            num_users = int(users.max()) + 1 if users.size else 0
+        if books.size and (books.min() < 0 or books.max() >= num_books):
+            raise ValueError("book index out of range")
+        if users.size and (users.min() < 0 or users.max() >= num_users):
+            raise ValueError("user index out of range")
+        if duplicates not in ('last', 'sum'):
+            raise ValueError(f"unknown duplicates mode {duplicates!r}, expected 'last' or 'sum'")
+
+        # Mehrfachbewertungen desselben Paares (Buch, Nutzende) zusammenfassen
+        books, users, ratings = _deduplicate(books, users, ratings, num_users, duplicates)
+
+        self.duplicates = duplicates
+        self.num_books = num_books
+        self.num_users = num_users
+        # CSR: Bewertungen nach Büchern gruppiert
+        self.book_indptr, self.book_users, self.book_ratings = _compress(books, users, ratings, num_books)
+        # CSC: Bewertungen nach Nutzenden gruppiert
+        self.user_indptr, self.user_books, self.user_ratings = _compress(users, books, ratings, num_users)
+
+    @classmethod
+    def from_dense(cls, R):
+        """
+        Creates the sparse representation of a dense matrix with np.nan for missing ratings.
+        """
+        R = np.asarray(R, dtype=np.float64)
+        books, users = np.nonzero(~np.isnan(R))
+        return cls(books, users, R[books, users], *R.shape)
+
+    @property
+    def shape(self):
+        return self.num_books, self.num_users
+
+    @property
+    def nnz(self):
+        """Number of observed ratings."""
+        return self.book_users.size
+
+    def triplets(self):
+        """
+        Returns the observed ratings as arrays (books, users, ratings) in CSR order.
+        """
+        books = np.repeat(np.arange(self.num_books, dtype=np.int32), np.diff(self.book_indptr))
+        return books, self.book_users, self.book_ratings
+
+    def merge(self, books, users, ratings):
+        """
+        Returns a new SparseRatings with additional ratings; a new rating
+        replaces (or with duplicates='sum' is added to) an existing rating
+        of the same (book, user) pair.
+        New book or user indices enlarge the matrix.
+        """
+        books = np.asarray(books, dtype=np.int32)
+        users = np.asarray(users, dtype=np.int32)
+        old_books, old_users, old_ratings = self.triplets()
+        num_books = max(self.num_books, int(books.max()) + 1 if books.size else 0)
+        num_users = max(self.num_users, int(users.max()) + 1 if users.size else 0)
+        return SparseRatings(np.concatenate((old_books, books)),
+                             np.concatenate((old_users, users)),
+                             np.concatenate((old_ratings, np.asarray(ratings, dtype=np.float64))),
+                             num_books, num_users, self.duplicates)
+
+
+def _update_factors_loop(target, fixed, indptr, indices, values, lambda_reg):
+    """
+    Solves (FᵢᵀFᵢ + λI) xᵢ = Fᵢᵀ rᵢ for every row i of target, where Fᵢ holds
+    the rows of fixed that belong to the observed entries of row i.
+    Rows without observations are left unchanged.
+    One call of numpy.linalg.solve per row (reference implementation).
+    """
+    k = fixed.shape[1]
+    reg = lambda_reg * np.eye(k)
+    for i in range(target.shape[0]):
+        start, stop = indptr[i], indptr[i + 1]
+        if start == stop:
+            continue
+        F_i = fixed[indices[start:stop]]
+        r_i = values[start:stop]
+        target[i] = solve(F_i.T @ F_i + reg, F_i.T @ r_i)
+
+
+def _solve_rows(target, fixed, indptr, indices, values, lambda_reg, rows, length):
+    """
+    Batched update of the given rows of target, which all have exactly length
+    observations: the factors are gathered as an (n, length, k) array, all Gram
+    matrices FᵢᵀFᵢ + λI are assembled as a stacked (n, k, k) array and solved
+    in a single call.
+    """
+    idx = indptr[rows][:, None] + np.arange(length)
+    F = fixed[indices[idx]]
+    F_T = F.transpose(0, 2, 1)
+    gram = F_T @ F + lambda_reg * np.eye(fixed.shape[1])
+    rhs = F_T @ values[idx][:, :, None]
+    target[rows] = solve(gram, rhs)[:, :, 0]
+
+
+def _update_factors_batched(target, fixed, indptr, indices, values, lambda_reg, max_chunk_bytes=1 << 26):
+    """
+    Same result as _update_factors_loop, but rows with the same number of
+    observations are solved together. The gathered factors of one batch
+    need at most max_chunk_bytes of memory.
+    """
+    k = fixed.shape[1]
+    counts = np.diff(indptr)
+    order = np.argsort(counts, kind='stable')
+    sorted_counts = counts[order]
+    # Gruppen von Zeilen mit gleicher Anzahl Beobachtungen
+    bounds = np.concatenate(([0], np.flatnonzero(np.diff(sorted_counts)) + 1, [order.size]))
+    for group_start, group_stop in zip(bounds[:-1], bounds[1:]):
+        length = int(sorted_counts[group_start]) if group_stop > group_start else 0
+        if length == 0:
+            continue
+        chunk_rows = max(1, max_chunk_bytes // (length * k * fixed.itemsize))
+        for lo in range(group_start, group_stop, chunk_rows):
+            rows = order[lo:min(lo + chunk_rows, group_stop)]
+            _solve_rows(target, fixed, indptr, indices, values, lambda_reg, rows, length)
+
+
+_SOLVERS = {
+    'loop': _update_factors_loop,
+    'batched': _update_factors_batched,
+}
+
+
+class _SharedArrays:
+    """
+    NumPy arrays copied into named shared memory blocks, so that worker
+    processes can attach to them by name instead of receiving pickled copies.
+    """
+
+    def __init__(self, arrays):
+        self._blocks = []
+        self.arrays = {}
+        self.specs = {}
+        for name, array in arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            self._blocks.append(block)
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+            view[...] = array
+            self.arrays[name] = view
+            self.specs[name] = (block.name, array.shape, array.dtype.str)
+
+    def close(self):
+        self.arrays.clear()
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+
+# in Worker-Prozessen: die über Shared Memory eingebundenen Arrays
+_worker_blocks = []
+_worker_arrays = {}
+
+
+def _attach_worker(specs):
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _worker_blocks.append(block)
+        _worker_arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+
+def _update_shard(arrays, side, lo, hi, lambda_reg, solver):
+    """
+    Updates the rows lo..hi-1 of V (side 'users') or U (side 'books').
+    The rows of a shard are disjoint from all other shards, so the workers
+    can write their results directly into the shared factor matrix.
+    """
+    if side == 'users':
+        target, fixed, prefix = arrays['V'], arrays['U'], 'user'
+    else:
+        target, fixed, prefix = arrays['U'], arrays['V'], 'book'
+    indptr = arrays[prefix + '_indptr']
+    _SOLVERS[solver](target[lo:hi], fixed, indptr[lo:hi + 1],
+                     arrays[prefix + '_indices'], arrays[prefix + '_ratings'], lambda_reg)
+
+
+def _update_shard_in_worker(side, lo, hi, lambda_reg, solver):
+    _update_shard(_worker_arrays, side, lo, hi, lambda_reg, solver)
+
+
+def _shards(indptr, num_shards):
+    """
+    Splits the rows into at most num_shards ranges with about the same number of observations.
+    """
+    targets = np.linspace(0, indptr[-1], num_shards + 1)[1:-1]
+    cuts = np.unique(np.concatenate(([0], np.searchsorted(indptr, targets), [indptr.size - 1])))
+    return list(zip(cuts[:-1].tolist(), cuts[1:].tolist()))
+
+
+@contextmanager
+def _half_steps(ratings, U, V, lambda_reg, solver, num_workers, backend):
+    """
+    Provides (U, V, update_users, update_books) for the training loop.
+    With num_workers > 1 the rows of each half-step are sharded across a
+    worker pool; with processes, U and V are then views into shared memory.
+    """
+    update_factors = _SOLVERS[solver]
+    if num_workers <= 1:
+        yield (U, V,
+               lambda: update_factors(V, U, ratings.user_indptr, ratings.user_books,
+                                      ratings.user_ratings, lambda_reg),
+               lambda: update_factors(U, V, ratings.book_indptr, ratings.book_users,
+                                      ratings.book_ratings, lambda_reg))
+        return
+
+    arrays = {
+        'U': U, 'V': V,
+        'user_indptr': ratings.user_indptr, 'user_indices': ratings.user_books,
+        'user_ratings': ratings.user_ratings,
+        'book_indptr': ratings.book_indptr, 'book_indices': ratings.book_users,
+        'book_ratings': ratings.book_ratings,
+    }
+    # mehrere Shards pro Worker gleichen ungleich teure Zeilenbereiche aus
+    user_shards = _shards(ratings.user_indptr, 4 * num_workers)
+    book_shards = _shards(ratings.book_indptr, 4 * num_workers)
+
+    if backend == 'thread':
+        # Threads teilen sich den Speicher; NumPy gibt in solve und matmul den GIL frei
+        with ThreadPoolExecutor(num_workers) as pool:
+            def run(side, shards):
+                list(pool.map(lambda shard: _update_shard(arrays, side, *shard, lambda_reg, solver), shards))
+            yield U, V, lambda: run('users', user_shards), lambda: run('books', book_shards)
+        return
+
+    shared = _SharedArrays(arrays)
+    try:
+        with ProcessPoolExecutor(num_workers, initializer=_attach_worker, initargs=(shared.specs,)) as pool:
+            def run(side, shards):
+                # Barriere: alle Shards eines Halbschritts müssen fertig sein
+                futures = [pool.submit(_update_shard_in_worker, side, lo, hi, lambda_reg, solver)
+                           for lo, hi in shards]
+                for future in futures:
+                    future.result()
+            yield (shared.arrays['U'], shared.arrays['V'],
+                   lambda: run('users', user_shards), lambda: run('books', book_shards))
+    finally:
+        shared.close()
+
+
+def _squared_error(U, V, books, users, values, chunk_size=1 << 20):
+    """
+    Sum of squared errors on the given entries, computed in chunks without U Vᵀ.
+    """
+    total = 0.0
+    for lo in range(0, values.size, chunk_size):
+        errors = values[lo:lo + chunk_size] - predict(U, V, books[lo:lo + chunk_size], users[lo:lo + chunk_size])
+        total += float(errors @ errors)
+    return total
+
+
+def rmse(U, V, ratings):
+    """
+    Root mean squared error of the predictions on the observed entries of ratings.
+    """
+    if ratings.nnz == 0:
+        return 0.0
+    return float(np.sqrt(_squared_error(U, V, *ratings.triplets()) / ratings.nnz))
+
+
+def als_sparse(ratings, k=2, lambda_reg=0.1, num_iter=10, seed=42, solver='batched',
+               num_workers=1, backend='process', init=None, tol=None, holdout=None, history=None):
+    """
+    Factorises the sparse rating matrix into book factors U and user factors V,
+    so that R ≈ U Vᵀ on the observed entries. Returns (U, V).
+    solver is either 'batched' (stacked solves) or 'loop' (one solve per row).
+    With num_workers > 1 the rows of each half-step are sharded across a pool
+    of processes (backend 'process', factors in shared memory) or threads
+    (backend 'thread').
+    init = (U, V) warm-starts the training from previously trained factors,
+    e.g. for a periodic full retrain after several fold_in calls; rows for
+    books or users that are new since then are initialised randomly.
+
+    If a list is passed as history, a dict is appended per iteration with the
+    regularised loss Σ(r - u·v)² + λ(|U|² + |V|²), the RMSE on the observed
+    entries, the RMSE on the holdout ratings (if given) and the wall time of
+    both half-steps. With tol, the training stops early as soon as the
+    relative improvement of the holdout RMSE (or of the loss, without
+    holdout) falls below tol; num_iter is then the maximum.
+    """
+    if solver not in _SOLVERS:
+        raise ValueError(f"unknown solver {solver!r}, expected one of {sorted(_SOLVERS)}")
+    if backend not in ('process', 'thread'):
+        raise ValueError(f"unknown backend {backend!r}, expected 'process' or 'thread'")
+    # gleiche Zufallsinitialisierung wie in als-recommender.py
+    random_state = np.random.RandomState(seed)
+    U = random_state.rand(ratings.num_books, k)  # Bücher-Faktoren
+    V = random_state.rand(ratings.num_users, k)  # Nutzenden-Faktoren
+    if init is not None:
+        U_init, V_init = init
+        if U_init.shape[1] != k or V_init.shape[1] != k:
+            raise ValueError(f"initial factors must have k = {k} columns")
+        U[:min(len(U), len(U_init))] = U_init[:len(U)]
+        V[:min(len(V), len(V_init))] = V_init[:len(V)]
+
+    track = history is not None or tol is not None
+    if track:
+        entries = ratings.triplets()
+    previous = None
+    with _half_steps(ratings, U, V, lambda_reg, solver, num_workers, backend) as (U, V, update_users, update_books):
+        for iteration in range(num_iter):
+            start = perf_counter()
+            # --- Schritt 1: Nutzer-Vektoren (V) aktualisieren ---
+            update_users()
+            middle = perf_counter()
+            # --- Schritt 2: Buch-Vektoren (U) aktualisieren ---
+            update_books()
+            end = perf_counter()
+            if not track:
+                continue
+
+            squared_error = _squared_error(U, V, *entries)
+            record = {
+                'iteration': iteration + 1,
+                'loss': squared_error + lambda_reg * (float(np.sum(U * U)) + float(np.sum(V * V))),
+                'rmse': float(np.sqrt(squared_error / max(ratings.nnz, 1))),
+                'time_users': middle - start,
+                'time_books': end - middle,
+            }
+            if holdout is not None:
+                record['holdout_rmse'] = rmse(U, V, holdout)
+            if history is not None:
+                history.append(record)
+
+            monitored = record['holdout_rmse'] if holdout is not None else record['loss']
+            if tol is not None and previous is not None and previous - monitored < tol * previous:
+                break
+            previous = monitored
+
+        # bei Shared Memory gehören U und V zum Pool und müssen kopiert werden
+        if num_workers > 1 and backend == 'process':
+            U, V = U.copy(), V.copy()
+    return U, V
+
+
+def _segment_sum(values, indptr):
+    """
+    Sums the rows of values within each segment indptr[i]:indptr[i + 1].
+    """
+    result = np.zeros((indptr.size - 1, values.shape[1]))
+    rows = np.flatnonzero(np.diff(indptr))
+    if rows.size:
+        result[rows] = np.add.reduceat(values, indptr[rows], axis=0)
+    return result
+
+
+def _update_factors_implicit(target, fixed, indptr, indices, counts, lambda_reg, alpha, cg_steps):
+    """
+    Implicit-feedback update with the conjugate gradient method.
+
+    Every entry of the matrix counts as observed: with preference 1 for rows
+    and columns with interactions and 0 otherwise, weighted with the confidence
+    c = 1 + alpha · count. Row i solves
+        (FᵀF + Fᵢᵀ(Cᵢ - I)Fᵢ + λI) xᵢ = FᵢᵀCᵢ 1
+    FᵀF is computed once for all rows, so the matrix-vector products only
+    need the interactions of row i. All rows run cg_steps CG steps at the
+    same time, warm-started from the current values of target.
+    """
+    entry_rows = np.repeat(np.arange(target.shape[0]), np.diff(indptr))
+    F = fixed[indices]
+    weights = alpha * counts  # c - 1
+    gram = fixed.T @ fixed + lambda_reg * np.eye(fixed.shape[1])
+
+    def multiply(X):
+        # (FᵀF + λI) x + Fᵢᵀ(Cᵢ - I)Fᵢ x für alle Zeilen gleichzeitig
+        dots = np.einsum('ij,ij->i', F, X[entry_rows])
+        return X @ gram + _segment_sum(F * (weights * dots)[:, None], indptr)
+
+    b = _segment_sum(F * (1 + weights)[:, None], indptr)
+    X = target
+    residual = b - multiply(X)
+    direction = residual.copy()
+    residual_norm = np.einsum('ij,ij->i', residual, residual)
+    for step in range(cg_steps):
+        A_direction = multiply(direction)
+        curvature = np.einsum('ij,ij->i', direction, A_direction)
+        step_size = np.divide(residual_norm, curvature, out=np.zeros_like(curvature), where=curvature > 0)
+        X += step_size[:, None] * direction
+        residual -= step_size[:, None] * A_direction
+        new_residual_norm = np.einsum('ij,ij->i', residual, residual)
+        beta = np.divide(new_residual_norm, residual_norm, out=np.zeros_like(residual_norm),
+                         where=residual_norm > 0)
+        direction = residual + beta[:, None] * direction
+        residual_norm = new_residual_norm
+
+
+def als_implicit(ratings, k=10, lambda_reg=0.1, alpha=40.0, num_iter=10, cg_steps=3, seed=42):
+    """
+    ALS for implicit feedback (e.g. number of loans instead of star ratings):
+    R ≈ U Vᵀ is fitted to the preference 1 for every interaction and 0 for
+    all other (book, user) pairs, weighted by the confidence 1 + alpha · count.
+    Each half-step costs O(nnz · k + (books + users) · k²) instead of
+    touching all books × users entries. Returns (U, V).
+    """
+    random_state = np.random.RandomState(seed)
+    # kleine Startwerte, da die Präferenzen 0 oder 1 sind
+    U = 0.01 * random_state.rand(ratings.num_books, k)
+    V = 0.01 * random_state.rand(ratings.num_users, k)
+    for iteration in range(num_iter):
+        # --- Schritt 1: Nutzer-Vektoren (V) aktualisieren ---
+        _update_factors_implicit(V, U, ratings.user_indptr, ratings.user_books, ratings.user_ratings,
+                                 lambda_reg, alpha, cg_steps)
+        # --- Schritt 2: Buch-Vektoren (U) aktualisieren ---
+        _update_factors_implicit(U, V, ratings.book_indptr, ratings.book_users, ratings.book_ratings,
+                                 lambda_reg, alpha, cg_steps)
+    return U, V
+
+
+def _fold_in_rows(target, fixed, indptr, indices, values, new_rows, new_cols, new_values, lambda_reg):
+    """
+    Re-solves only the rows of target that occur in new_rows, using their
+    previous observations (from indptr/indices/values) plus the new ones.
+    """
+    rows = np.unique(new_rows)
+    # bisherige Beobachtungen der betroffenen Zeilen einsammeln
+    known = rows[rows < indptr.size - 1]
+    starts, stops = indptr[known], indptr[known + 1]
+    counts = stops - starts
+    positions = np.repeat(stops - np.cumsum(counts), counts) + np.arange(counts.sum())
+    all_rows = np.concatenate((np.repeat(known, counts), new_rows))
+    all_cols = np.concatenate((indices[positions], new_cols))
+    all_values = np.concatenate((values[positions], new_values))
+
+    # kleine CSR-Struktur nur für die betroffenen Zeilen (neue Bewertungen gewinnen)
+    local_rows = np.searchsorted(rows, all_rows).astype(np.int32)
+    local_rows, all_cols, all_values = _deduplicate(local_rows, all_cols, all_values, fixed.shape[0])
+    local_indptr, local_cols, local_values = _compress(local_rows, all_cols, all_values, rows.size)
+    local_target = target[rows]
+    _update_factors_batched(local_target, fixed, local_indptr, local_cols, local_values, lambda_reg)
+    target[rows] = local_target
+
+
+def _grow(factors, num_rows):
+    if num_rows <= factors.shape[0]:
+        return factors
+    grown = np.zeros((num_rows, factors.shape[1]), dtype=factors.dtype)
+    grown[:factors.shape[0]] = factors
+    return grown
+
+
+def fold_in(ratings, U, V, books, users, values, lambda_reg=0.1):
+    """
+    Incorporates a batch of new (book, user, rating) events into trained
+    factors without retraining: only the vectors of the affected users and
+    then of the affected books are re-solved.
+    ratings are the ratings the factors were trained on; merge the events into
+    them with ratings.merge(...) before the next fold_in or full retrain.
+    Returns (U, V); they are updated in place unless new books or users
+    require larger matrices (new rows start at zero).
+    """
+    books = np.asarray(books, dtype=np.int32)
+    users = np.asarray(users, dtype=np.int32)
+    values = np.asarray(values, dtype=np.float64)
+    if books.size == 0:
+        return U, V
+    U = _grow(U, int(books.max()) + 1)
+    V = _grow(V, int(users.max()) + 1)
+    # --- Schritt 1: betroffene Nutzer-Vektoren (V) aktualisieren ---
+    _fold_in_rows(V, U, ratings.user_indptr, ratings.user_books, ratings.user_ratings,
+                  users, books, values, lambda_reg)
+    # --- Schritt 2: betroffene Buch-Vektoren (U) aktualisieren ---
+    _fold_in_rows(U, V, ratings.book_indptr, ratings.book_users, ratings.book_ratings,
+                  books, users, values, lambda_reg)
+    return U, V
+
+
+def predict(U, V, books, users):
+    """
+    Predicts the ratings for the given (book, user) pairs without computing U Vᵀ.
+    """
+    return np.einsum('ij,ij->i', U[books], V[users])
+
+
+def random_ratings(num_books, num_users, num_ratings, seed=0):
+    """
+    Generates a random sparse rating matrix with ratings 1..5 (for benchmarks).
+    """
+    rng = np.random.default_rng(seed)
+    books = rng.integers(0, num_books, num_ratings)
+    users = rng.integers(0, num_users, num_ratings)
+    values = rng.integers(1, 6, num_ratings)
+    return SparseRatings(books, users, values, num_books, num_users)
+
+
+def benchmark_solvers(num_books=20000, num_users=5000, num_ratings=200000, k=10):
+    """
+    Compares one ALS sweep with the per-row loop and with the batched solver.
+    """
+    ratings = random_ratings(num_books, num_users, num_ratings)
+    print(f"Benchmark: {num_books} Bücher × {num_users} Nutzende, {ratings.nnz} Bewertungen, k = {k}")
+    results = {}
+    for solver in ('loop', 'batched'):
+        start = perf_counter()
+        results[solver] = als_sparse(ratings, k=k, num_iter=1, solver=solver)
+        print(f"  {solver:8s}: {perf_counter() - start:.3f} s pro Iteration")
+    deviation = max(np.abs(a - b).max() for a, b in zip(results['loop'], results['batched']))
+    print(f"  maximale Abweichung der Faktoren: {deviation:.2e}")
+
+
+def benchmark_parallel(num_books=200000, num_users=50000, num_ratings=2000000, k=16, max_workers=None):
+    """
+    Measures the time of one ALS sweep for 1, 2, 4, ... worker processes.
+    """
+    import os
+
+    max_workers = max_workers or os.cpu_count()
+    ratings = random_ratings(num_books, num_users, num_ratings)
+    print(f"Benchmark: {num_books} Bücher × {num_users} Nutzende, {ratings.nnz} Bewertungen, k = {k}")
+    num_workers = 1
+    while num_workers <= max_workers:
+        start = perf_counter()
+        als_sparse(ratings, k=k, num_iter=1, num_workers=num_workers)
+        print(f"  {num_workers:3d} Worker: {perf_counter() - start:.3f} s pro Iteration")
+        num_workers *= 2
+
+
+if __name__ == '__main__':
+    # dieselbe Empfehlungsmatrix wie in als-recommender.py,
+    # diesmal aber nur mit den beobachteten Bewertungen als Tripel
+    books = [0, 0, 1, 1, 2, 2]
+    users = [0, 2, 0, 1, 1, 2]
+    values = [5, 3, 4, 2, 1, 4]
+    ratings = SparseRatings(books, users, values, num_books=3, num_users=3)
+
+    history = []
+    U, V = als_sparse(ratings, k=2, lambda_reg=0.1, num_iter=2, history=history)
+    for record in history:
+        print(f"Iteration {record['iteration']}: Loss {record['loss']:.3f}, RMSE {record['rmse']:.3f}")
+
+    # Vorhersage nur für die fehlenden Einträge
+    missing_books = np.array([0, 1, 2])
+    missing_users = np.array([1, 2, 0])
+    for book, user, value in zip(missing_books, missing_users, predict(U, V, missing_books, missing_users)):
+        print(f"Buch {book}, Nutzende {user}: vorhergesagte Bewertung {value:.1f}")
+
+    # neue Bewertung (Buch 2 von Nutzende 0) ohne erneutes Training einarbeiten
+    U, V = fold_in(ratings, U, V, [2], [0], [2])
+    ratings = ratings.merge([2], [0], [2])
+    print(f"nach Fold-in: Buch 0, Nutzende 1: vorhergesagte Bewertung {predict(U, V, [0], [1])[0]:.1f}")
+
+    # implizites Feedback: Ausleihen statt Bewertungen (jede Zeile eine Ausleihe)
+    loans = SparseRatings([0, 0, 0, 1, 1, 2, 2], [0, 0, 2, 0, 1, 1, 2], np.ones(7), duplicates='sum')
+    U, V = als_implicit(loans, k=2, num_iter=5)
+    print("Präferenzen aus Ausleihen (Bücher × Nutzende):")
+    print(np.round(U @ V.T, 2))
+
+    print()
+    benchmark_solvers()
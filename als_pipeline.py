@@ -0,0 +1,190 @@
+"""
+Nicht-interaktive Trainings-Pipeline für das ALS-Recommender-System
+
+Die Bewertungen bzw. Ausleihen werden aus großen CSV- oder NDJSON-Dateien
+(auch gzip-komprimiert) blockweise gelesen. Buch- und Nutzenden-IDs werden
+dabei fortlaufend auf Zeilenindizes abgebildet und jeder Block sofort in
+kompakte NumPy-Arrays überführt, so dass nie die ganze Datei als Python-Listen
+im Speicher liegt. Anschließend wird das Modell trainiert und mit den
+ID-Zuordnungen gespeichert. Die Heatmap der Vorhersagen ist optional und
+importiert matplotlib erst, wenn sie angefordert wird.
+
+Beispiel:
+    python als_pipeline.py ausleihen.csv.gz modell/ --implicit --k 32
+"""
+
+import argparse
+import csv
+import gzip
+import json
+
+import numpy as np
+
+from als_engine import SparseRatings, als_implicit, als_sparse
+from als_serving import save_model
+
+
+class IdMap:
+    """
+    Assigns consecutive indices 0, 1, 2, ... to external ids in order of appearance.
+    """
+
+    def __init__(self):
+        self._index = {}
+        self.ids = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def lookup(self, keys):
+        """Returns the indices of keys as int32 array, adding unknown ids."""
+        index = self._index
+        result = np.empty(len(keys), dtype=np.int32)
+        for position, key in enumerate(keys):
+            value = index.get(key)
+            if value is None:
+                value = index[key] = len(self.ids)
+                self.ids.append(key)
+            result[position] = value
+        return result
+
+    def to_array(self):
+        return np.array(self.ids)
+
+
+def _open_text(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def _records(path, file_format):
+    with _open_text(path) as f:
+        if file_format == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def read_chunks(path, book_field='book', user_field='user', rating_field='rating',
+                file_format=None, chunk_size=100000):
+    """
+    Streams the file and yields chunks (books, users, ratings) of at most
+    chunk_size records; books and users are lists of ids (as str), ratings
+    a float64 array. Without rating_field every record counts as 1 (e.g. a loan).
+    """
+    if file_format is None:
+        file_format = 'ndjson' if path.removesuffix('.gz').endswith(('.ndjson', '.jsonl')) else 'csv'
+    if file_format not in ('csv', 'ndjson'):
+        raise ValueError(f"unknown file format {file_format!r}, expected 'csv' or 'ndjson'")
+    books, users, ratings = [], [], []
+    for record in _records(path, file_format):
+        books.append(str(record[book_field]))
+        users.append(str(record[user_field]))
+        ratings.append(float(record[rating_field]) if rating_field else 1.0)
+        if len(books) == chunk_size:
+            yield books, users, np.array(ratings)
+            books, users, ratings = [], [], []
+    if books:
+        yield books, users, np.array(ratings)
+
+
+def build_ratings(chunks, duplicates='last'):
+    """
+    Builds the sparse rating matrix from the chunks of read_chunks.
+    Returns (ratings, book_map, user_map).
+    """
+    book_map, user_map = IdMap(), IdMap()
+    book_parts, user_parts, rating_parts = [], [], []
+    for books, users, ratings in chunks:
+        book_parts.append(book_map.lookup(books))
+        user_parts.append(user_map.lookup(users))
+        rating_parts.append(ratings)
+    if not book_parts:
+        return SparseRatings([], [], [], 0, 0, duplicates), book_map, user_map
+    ratings = SparseRatings(np.concatenate(book_parts), np.concatenate(user_parts),
+                            np.concatenate(rating_parts), len(book_map), len(user_map), duplicates)
+    return ratings, book_map, user_map
+
+
+def plot_predictions(U, V, ratings, max_books=20, max_users=20):
+    """
+    Heatmap of the predictions for the first books and users, known ratings in white.
+    Only this block of U Vᵀ is computed.
+    """
+    import matplotlib.pyplot as plt
+
+    num_books = min(max_books, U.shape[0])
+    num_users = min(max_users, V.shape[0])
+    R_pred = U[:num_books] @ V[:num_users].T
+
+    fig, ax = plt.subplots()
+    cax = ax.matshow(R_pred, cmap='viridis')
+    known = set()
+    for book in range(num_books):
+        start, stop = ratings.book_indptr[book], ratings.book_indptr[book + 1]
+        for user, value in zip(ratings.book_users[start:stop], ratings.book_ratings[start:stop]):
+            if user < num_users:
+                known.add((book, user))
+                ax.text(user, book, f"{value:.1f}", va='center', ha='center', color='white', fontweight='bold')
+    for book in range(num_books):
+        for user in range(num_users):
+            if (book, user) not in known:
+                ax.text(user, book, f"{R_pred[book, user]:.1f}", va='center', ha='center', color='red')
+    ax.set_xlabel("Nutzende")
+    ax.set_ylabel("Bücher")
+    ax.set_title("Recommender: Bekannte Werte (weiß) und Vorhersagen (rot)")
+    fig.colorbar(cax, label="Bewertung")
+    plt.show()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trainiert ein ALS-Modell aus einer CSV- oder NDJSON-Datei.")
+    parser.add_argument('input', help="CSV- oder NDJSON-Datei (optional .gz)")
+    parser.add_argument('output', help="Verzeichnis für das trainierte Modell")
+    parser.add_argument('--format', choices=['csv', 'ndjson'], help="Dateiformat (Standard: aus der Endung)")
+    parser.add_argument('--book-field', default='book')
+    parser.add_argument('--user-field', default='user')
+    parser.add_argument('--rating-field', default='rating')
+    parser.add_argument('--implicit', action='store_true',
+                        help="jede Zeile ist eine Ausleihe (keine Bewertungsspalte)")
+    parser.add_argument('--alpha', type=float, default=40.0, help="Konfidenzgewicht für --implicit")
+    parser.add_argument('--k', type=int, default=16, help="Anzahl der latenten Features")
+    parser.add_argument('--lambda-reg', type=float, default=0.1)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--tol', type=float, help="Abbruch bei relativer Verbesserung kleiner als tol")
+    parser.add_argument('--workers', type=int, help="Anzahl paralleler Prozesse (Standard: 1)")
+    parser.add_argument('--chunk-size', type=int, default=100000)
+    parser.add_argument('--plot', action='store_true', help="Heatmap der Vorhersagen anzeigen")
+    args = parser.parse_args(argv)
+    if args.implicit and (args.workers is not None or args.tol is not None):
+        parser.error("--workers and --tol are not supported together with --implicit")
+
+    chunks = read_chunks(args.input, args.book_field, args.user_field,
+                         None if args.implicit else args.rating_field, args.format, args.chunk_size)
+    ratings, book_map, user_map = build_ratings(chunks, 'sum' if args.implicit else 'last')
+    print(f"{ratings.nnz} Einträge für {ratings.num_books} Bücher und {ratings.num_users} Nutzende gelesen")
+
+    if args.implicit:
+        U, V = als_implicit(ratings, k=args.k, lambda_reg=args.lambda_reg, alpha=args.alpha,
+                            num_iter=args.iterations)
+    else:
+        history = []
+        U, V = als_sparse(ratings, k=args.k, lambda_reg=args.lambda_reg, num_iter=args.iterations,
+                          num_workers=args.workers or 1, tol=args.tol, history=history)
+        for record in history:
+            print(f"Iteration {record['iteration']}: Loss {record['loss']:.4f}, RMSE {record['rmse']:.4f}, "
+                  f"{record['time_users'] + record['time_books']:.2f} s")
+
+    save_model(args.output, U, V, book_map.to_array(), user_map.to_array(),
+               metadata={'source': args.input, 'implicit': args.implicit, 'lambda_reg': args.lambda_reg})
+    print(f"Modell gespeichert in {args.output}")
+
+    if args.plot:
+        plot_predictions(U, V, ratings)
+
+
+if __name__ == '__main__':
+    main()
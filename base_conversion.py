@@ -0,0 +1,343 @@
+"""
+Umwandlung von Zahlen zwischen Stellenwertsystemen zur Basis 2 bis 36
+
+Anders als number_value.py, das für jede Ziffer einer Binärzahl eine neue
+Potenz base ** position berechnet, arbeiten die Funktionen auch für Zahlen
+mit Millionen Stellen:
+- from_string und to_string zerlegen lange Ziffernfolgen rekursiv in zwei
+  Hälften ("Teile und herrsche") und verwenden zwischengespeicherte Potenzen
+  base^(k · 2^i); die Division durch diese Potenzen erfolgt mit
+  Barrett-Reduktion über ein vorab berechnetes Reziprok (nur Multiplikationen)
+- für Basen, die Zweierpotenzen sind (2, 4, 8, 16, 32), genügen Bitoperationen
+- from_strings und to_strings wandeln ganze Arrays kurzer Zahlen mit NumPy um
+"""
+
+import re
+from time import perf_counter
+
+import numpy as np
+
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+_INT64_MAX = 2**63 - 1
+
+# Länge der Blätter der Rekursion (unterhalb der Grenze von int() für lange Zeichenketten)
+_LEAF_DIGITS = 512
+
+_DIGIT_BYTES = np.frombuffer(DIGITS.encode(), dtype=np.uint8)
+_DIGIT_VALUES = np.full(256, 255, dtype=np.uint8)
+_DIGIT_VALUES[_DIGIT_BYTES] = np.arange(36)
+_DIGIT_VALUES[np.frombuffer(DIGITS.upper().encode(), dtype=np.uint8)] = np.arange(36)
+
+# zwischengespeicherte Potenzen base^(_LEAF_DIGITS · 2^i) und ihre Reziproken
+_powers = {}
+_reciprocals = {}
+
+
+def _check_base(base):
+    if not 2 <= base <= 36:
+        raise ValueError("base must be between 2 and 36")
+
+
+def _power(base, level):
+    """
+    base^(_LEAF_DIGITS · 2^level), computed by repeated squaring and cached.
+    """
+    powers = _powers.setdefault(base, [base ** _LEAF_DIGITS])
+    while len(powers) <= level:
+        powers.append(powers[-1] * powers[-1])
+    return powers[level]
+
+
+def _reciprocal(m):
+    """
+    floor(4^n / m) for n = m.bit_length() by Newton's iteration with doubling
+    precision; needs only multiplications, no long division of big numbers.
+    """
+    n = m.bit_length()
+    if n <= 4096:
+        return (1 << 2 * n) // m
+    h = n // 2 + 1
+    y = _reciprocal(m >> (n - h)) << (n - h)
+    y = 2 * y - (m * y * y >> 2 * n)
+    # y weicht nur um wenige Einheiten ab
+    r = (1 << 2 * n) - m * y
+    while r < 0:
+        y -= 1
+        r += m
+    while r >= m:
+        y += 1
+        r -= m
+    return y
+
+
+def _divmod(x, base, level):
+    """
+    divmod(x, _power(base, level)) by Barrett reduction for x < _power(base, level)².
+    """
+    m = _power(base, level)
+    key = (base, level)
+    if key not in _reciprocals:
+        _reciprocals[key] = _reciprocal(m)
+    n = m.bit_length()
+    q = (x >> (n - 1)) * _reciprocals[key] >> (n + 1)
+    r = x - q * m
+    while r >= m:
+        q += 1
+        r -= m
+    return q, r
+
+
+def _word_digits(base):
+    """
+    Number w of base-b digits per int64 word (base^w < 2^63).
+    """
+    w = 1
+    while base ** (w + 1) < 2**63:
+        w += 1
+    return w
+
+
+def _digit_matrix(values, base, width):
+    """
+    Digits of non-negative int64 values as a (len(values), width) matrix,
+    most significant digit first.
+    """
+    w = _word_digits(base)
+    if width <= w:
+        weights = np.array([base ** i for i in range(width - 1, -1, -1)], dtype=np.int64)
+        return values[:, None] // weights % base
+    high = _digit_matrix(values // base ** w, base, width - w)
+    return np.hstack([high, _digit_matrix(values % base ** w, base, w)])
+
+
+def _leaves_to_bytes(leaves, base):
+    """
+    Concatenated zero-padded digits of the leaves (each < base^_LEAF_DIGITS).
+    """
+    w = _word_digits(base)
+    word = base ** w
+    num_words = -(-_LEAF_DIGITS // w)
+    words = np.empty((len(leaves), num_words), dtype=np.int64)
+    for i, leaf in enumerate(leaves):
+        for j in range(num_words - 1, -1, -1):
+            leaf, words[i, j] = divmod(leaf, word)
+    digits = _digit_matrix(words.ravel(), base, w).reshape(len(leaves), -1)
+    return _DIGIT_BYTES[digits[:, -_LEAF_DIGITS:]].tobytes()
+
+
+def _split(n, base, level, leaves):
+    """
+    Appends the leaves of n < _power(base, level + 1) in order of significance.
+    """
+    if level < 0:
+        leaves.append(n)
+        return
+    high, low = _divmod(n, base, level)
+    _split(high, base, level - 1, leaves)
+    _split(low, base, level - 1, leaves)
+
+
+def _to_string_power_of_two(n, base):
+    """
+    Digits of n ≥ 0 for base 2^b from the bits of n, without any division.
+    """
+    if base in (2, 8, 16):
+        return format(n, {2: 'b', 8: 'o', 16: 'x'}[base])
+    b = base.bit_length() - 1
+    num_digits = max(1, -(-n.bit_length() // b))
+    bits = np.unpackbits(np.frombuffer(n.to_bytes(-(-num_digits * b // 8), 'big'), dtype=np.uint8))
+    bits = bits[bits.size - num_digits * b:].reshape(num_digits, b)
+    digits = bits @ (1 << np.arange(b - 1, -1, -1))
+    return _DIGIT_BYTES[digits].tobytes().decode()
+
+
+def to_string(n, base=10):
+    """
+    String of the integer n in the given base (lower-case digits, '-' for negative n).
+    """
+    _check_base(base)
+    sign = '-' if n < 0 else ''
+    n = abs(n)
+    if base & (base - 1) == 0:
+        return sign + _to_string_power_of_two(n, base)
+    # kleinste Stufe, deren Potenz n überdeckt: n < (base^(_LEAF_DIGITS · 2^level))²
+    level = -1
+    while n >= _power(base, level + 1):
+        level += 1
+    leaves = []
+    _split(n, base, level, leaves)
+    digits = _leaves_to_bytes(leaves, base).decode().lstrip('0')
+    return sign + (digits or '0')
+
+
+def _parse(s, base, level):
+    """
+    Value of the digit string s with len(s) ≤ _LEAF_DIGITS · 2^(level + 1).
+    """
+    if len(s) <= _LEAF_DIGITS:
+        return int(s, base)
+    k = _LEAF_DIGITS << level
+    if len(s) <= k:
+        return _parse(s, base, level - 1)
+    return _parse(s[:-k], base, level - 1) * _power(base, level) + _parse(s[-k:], base, level - 1)
+
+
+def from_string(s, base=10):
+    """
+    Integer value of the string s in the given base (case-insensitive,
+    optionally with a leading '-' or '+').
+    """
+    _check_base(base)
+    s = s.strip()
+    sign = -1 if s.startswith('-') else 1
+    s = s[1:] if s[:1] in '+-' else s
+    if not re.fullmatch(f'[{DIGITS[:base]}]+', s, re.IGNORECASE):
+        raise ValueError(f"invalid literal for base {base}: {s[:20]!r}")
+    if base & (base - 1) == 0:
+        # int() arbeitet bei Zweierpotenzen ohnehin in linearer Zeit
+        return sign * int(s, base)
+    level = 0
+    while _LEAF_DIGITS << (level + 1) < len(s):
+        level += 1
+    return sign * _parse(s, base, level)
+
+
+def convert(s, from_base, to_base):
+    """
+    Converts the digit string s from from_base to to_base.
+    """
+    return to_string(from_string(s, from_base), to_base)
+
+
+def to_strings(values, base=10, width=None):
+    """
+    Bulk mode: converts an array of non-negative int64 numbers into an array
+    of byte strings, zero-padded to width digits if width is given.
+    """
+    _check_base(base)
+    values = np.asarray(values, dtype=np.int64)
+    if values.size and values.min() < 0:
+        raise ValueError("to_strings only supports non-negative numbers")
+    max_width = len(to_string(int(values.max()), base)) if values.size else 1
+    digits = _DIGIT_BYTES[_digit_matrix(values.ravel(), base, max(width or 0, max_width))]
+    strings = np.ascontiguousarray(digits).view(f'S{digits.shape[1]}').reshape(values.shape)
+    if width is None:
+        strings = np.char.lstrip(strings, b'0')
+        strings[strings == b''] = b'0'
+    return strings
+
+
+def from_strings(strings, base=10):
+    """
+    Bulk mode: converts a sequence of short digit strings (str or bytes, at
+    most as many digits as fit into int64) into an int64 array.
+    """
+    _check_base(base)
+    strings = np.asarray(strings)
+    if strings.dtype.kind == 'U':
+        strings = np.char.encode(strings, 'ascii')
+    strings = np.char.strip(strings.astype('S'))
+    if strings.size == 0:
+        return np.zeros(strings.shape, dtype=np.int64)
+    width = strings.dtype.itemsize
+    if width > _word_digits(base) + 1:
+        raise OverflowError(f"at most {_word_digits(base) + 1} digits in base {base} fit into int64")
+    matrix = strings.reshape(-1).view(np.uint8).reshape(-1, width)
+    present = matrix != 0  # kürzere Zeichenketten sind rechts mit Nullbytes aufgefüllt
+    digits = _DIGIT_VALUES[matrix].astype(np.int64)
+    invalid = present & (digits >= base)
+    invalid[:, 0] |= ~present[:, 0]
+    if invalid.any():
+        row = int(np.flatnonzero(invalid.any(axis=1))[0])
+        raise ValueError(f"invalid literal for base {base}: {strings.reshape(-1)[row].decode()!r}")
+    values = np.zeros(matrix.shape[0], dtype=np.int64)
+    for column in range(width):
+        if column >= _word_digits(base):
+            # erst die letzte mögliche Stelle kann int64 überlaufen lassen
+            too_large = present[:, column] & (values > (_INT64_MAX - digits[:, column]) // base)
+            if too_large.any():
+                raise OverflowError("value does not fit into int64")
+        values = np.where(present[:, column], values * base + digits[:, column], values)
+    return values.reshape(strings.shape)
+
+
+def _positional(number, base):
+    """
+    Reference from number_value.py: one new power per digit.
+    """
+    value = 0
+    for position, digit in enumerate(reversed(number)):
+        value += base ** position * int(digit, base)
+    return value
+
+
+def benchmark():
+    """
+    Compares the conversions with the per-digit loop of number_value.py and
+    with int()/str() (whose limit for long strings is lifted for the comparison).
+    """
+    import sys
+
+    limit = sys.get_int_max_str_digits()
+    sys.set_int_max_str_digits(0)
+    try:
+        rng = np.random.default_rng(0)
+        numbers = []
+        print("Benchmark: Zeichenkette → Zahl (Basis 10)")
+        for num_digits in (10**4, 10**5, 10**6):
+            s = '9' + _DIGIT_BYTES[rng.integers(0, 10, num_digits - 1)].tobytes().decode()
+            start = perf_counter()
+            value = from_string(s)
+            ours = perf_counter() - start
+            start = perf_counter()
+            reference = int(s)
+            builtin = perf_counter() - start
+            assert value == reference
+            numbers.append(value)
+            line = f"  {num_digits:8d} Stellen: from_string {ours:7.3f} s, int() {builtin:7.3f} s"
+            if num_digits <= 10**4:
+                start = perf_counter()
+                assert _positional(s, 10) == value
+                line += f", Stellenwertschleife {perf_counter() - start:7.3f} s"
+            print(line)
+        print("Benchmark: Zahl → Zeichenkette (Basis 10)")
+        for n in numbers:
+            start = perf_counter()
+            s = to_string(n)
+            ours = perf_counter() - start
+            start = perf_counter()
+            reference = str(n)
+            builtin = perf_counter() - start
+            assert s == reference
+            print(f"  {len(s):8d} Stellen: to_string {ours:7.3f} s, str() {builtin:7.3f} s")
+    finally:
+        sys.set_int_max_str_digits(limit)
+
+    count = 10**6
+    values = rng.integers(0, 2**62, count)
+    print(f"Benchmark: {count} Zahlen in Basis 36")
+    start = perf_counter()
+    strings = to_strings(values, 36)
+    bulk = perf_counter() - start
+    start = perf_counter()
+    reference = [np.base_repr(v, 36) for v in values[:count // 10].tolist()]
+    loop = (perf_counter() - start) * 10
+    assert [s.decode().upper() for s in strings[:count // 10].tolist()] == reference
+    start = perf_counter()
+    assert np.array_equal(from_strings(strings, 36), values)
+    parse = perf_counter() - start
+    print(f"  to_strings {bulk:.3f} s, np.base_repr in Schleife ≈ {loop:.3f} s, from_strings {parse:.3f} s")
+
+
+if __name__ == '__main__':
+    number = '11101'
+    print(f"(Decimal) Value of {number} is: {from_string(number, 2)}")
+    print(convert('ff', 16, 2), convert('zz', 36, 10), to_string(-255, 32))
+    print(to_strings([0, 7, 255, 2**40], 16))
+    print(from_strings(['11101', '0', '1111111111'], 2))
+    n = 3 ** 20000
+    print(f"3^20000 hat {len(to_string(n))} Dezimalstellen")
+    print(f"zur Basis 7: {len(to_string(n, 7))} Stellen, zurück umgewandelt gleich: {from_string(to_string(n, 7), 7) == n}")
+    print()
+    benchmark()
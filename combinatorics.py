@@ -0,0 +1,345 @@
+"""
+Schnelle Berechnung vieler Binomialkoeffizienten "n über k"
+
+Die Funktion binomial_coefficient aus binomial-coefficient.py berechnet
+nCk bei jedem Aufruf neu. Für viele Aufrufe gibt es hier:
+- einen Cache (LRU, begrenzte Größe) für wiederholte Aufrufe
+- eine vorberechnete Tabelle der Fakultäten und inversen Fakultäten modulo
+  einer Primzahl p, mit der nCk mod p = n! · (k!)⁻¹ · ((n-k)!)⁻¹ mod p
+  in konstanter Zeit (auch für ganze NumPy-Arrays) berechnet wird
+- den Satz von Lucas für sehr große n modulo einer Primzahl p:
+  nCk mod p ist das Produkt der Binomialkoeffizienten der Ziffern von n
+  und k in der Darstellung zur Basis p (für kleine p aus einer Tabelle)
+Für exakte Werte mit sehr großem n (10⁵ bis 10⁶) werden n! und nCk über ihre
+Primfaktorzerlegung berechnet (Formel von Legendre bzw. Satz von Kummer,
+für n! der "Prime Swing" von P. Luschny). Die Faktoren werden dabei nicht
+einzeln nacheinander, sondern paarweise in einem Baum multipliziert
+(binäres Aufspalten), so dass meist gleich große Zahlen multipliziert werden.
+"""
+
+import math
+from functools import lru_cache
+from time import perf_counter
+
+import numpy as np
+
+from prime_sieve import primes_in_range
+
+
+def binomial_coefficient(n, k):
+    """
+    Calculates the binomial coefficient n choose k (nCk) with a product loop
+    (as in binomial-coefficient.py); reference for the benchmarks.
+    """
+    if k < 0 or k > n:
+        return 0
+    if k == 0 or k == n:
+        return 1
+    k = min(k, n - k)  # Symmetrie nCk == nC(n-k) ausnutzen
+    c = 1
+    for i in range(k):
+        c = c * (n - i) // (i + 1)
+    return c
+
+
+def cached_binomial(maxsize=1 << 16):
+    """
+    Returns a binomial function with an LRU cache of at most maxsize entries.
+    """
+    @lru_cache(maxsize=maxsize)
+    def binomial(n, k):
+        if k < 0 or k > n:
+            return 0
+        return math.comb(n, min(k, n - k))
+    return binomial
+
+
+# Standard-Cache für Ad-hoc-Aufrufe, binomial.cache_info() zeigt die Trefferquote
+binomial = cached_binomial()
+
+
+class BinomialTable:
+    """
+    Factorials and inverse factorials modulo a prime p for 0 ≤ n ≤ n_max,
+    so that nCk mod p costs two multiplications. Requires n_max < p,
+    otherwise n! ≡ 0 (mod p) has no inverse (use binomial_lucas instead).
+    p < 2³¹ allows vectorized evaluation with int64 arrays.
+    """
+
+    def __init__(self, n_max, p=1_000_000_007):
+        if n_max >= p:
+            raise ValueError(f"n_max = {n_max} must be smaller than the prime p = {p}")
+        self.n_max = n_max
+        self.p = p
+        factorials = [1] * (n_max + 1)
+        for i in range(1, n_max + 1):
+            factorials[i] = factorials[i - 1] * i % p
+        # kleiner Satz von Fermat: a⁻¹ ≡ a^(p-2) (mod p), danach rückwärts
+        inverse = [1] * (n_max + 1)
+        inverse[n_max] = pow(factorials[n_max], p - 2, p)
+        for i in range(n_max, 0, -1):
+            inverse[i - 1] = inverse[i] * i % p
+        self.factorials = factorials
+        self.inverse_factorials = inverse
+        if p < 2**31:
+            self._factorials = np.array(factorials, dtype=np.int64)
+            self._inverse_factorials = np.array(inverse, dtype=np.int64)
+
+    def __call__(self, n, k):
+        """nCk mod p for 0 ≤ n ≤ n_max."""
+        if k < 0 or k > n:
+            return 0
+        if n > self.n_max:
+            raise ValueError(f"n = {n} exceeds n_max = {self.n_max}")
+        return self.factorials[n] * self.inverse_factorials[k] % self.p * self.inverse_factorials[n - k] % self.p
+
+    def batch(self, n, k):
+        """
+        nCk mod p for arrays n and k (element-wise), as int64 array.
+        """
+        if self.p >= 2**31:
+            raise ValueError("vectorized evaluation needs p < 2**31")
+        n = np.asarray(n, dtype=np.int64)
+        k = np.asarray(k, dtype=np.int64)
+        if n.size and n.max() > self.n_max:
+            raise ValueError(f"n exceeds n_max = {self.n_max}")
+        valid = (k >= 0) & (k <= n)
+        k_safe = np.where(valid, k, 0)
+        n_safe = np.where(valid, n, 0)
+        result = self._factorials[n_safe] * self._inverse_factorials[k_safe] % self.p
+        result = result * self._inverse_factorials[n_safe - k_safe] % self.p
+        return np.where(valid, result, 0)
+
+
+# nur für kleine Primzahlen lohnt sich eine Tabelle aller Ziffern 0..p-1
+LUCAS_TABLE_LIMIT = 10**6
+
+_lucas_tables = {}
+
+
+@lru_cache(maxsize=64)
+def _check_prime(p):
+    from factorization import is_probable_prime
+    if not is_probable_prime(p):
+        raise ValueError(f"p = {p} must be prime")
+
+
+def binomial_lucas(n, k, p):
+    """
+    nCk mod p for a prime p and arbitrarily large n with the theorem of Lucas;
+    raises ValueError if p is not prime. For p ≤ LUCAS_TABLE_LIMIT the digit
+    binomials come from a cached BinomialTable, otherwise from math.comb.
+    """
+    _check_prime(p)
+    if k < 0 or k > n:
+        return 0
+    if p <= LUCAS_TABLE_LIMIT:
+        table = _lucas_tables.get(p)
+        if table is None:
+            table = _lucas_tables[p] = BinomialTable(p - 1, p)
+    else:
+        table = lambda n_digit, k_digit: math.comb(n_digit, k_digit) % p
+    result = 1
+    while k:
+        n, n_digit = divmod(n, p)
+        k, k_digit = divmod(k, p)
+        if k_digit > n_digit:
+            return 0
+        result = result * table(n_digit, k_digit) % p
+    return result
+
+
+def binomial_mod(n, k, p):
+    """
+    nCk mod p for a prime p: directly for n < p, otherwise with the theorem of
+    Lucas; raises ValueError if p is not prime.
+    """
+    if n < p:
+        _check_prime(p)
+        return math.comb(n, k) % p if 0 <= k <= n else 0
+    return binomial_lucas(n, k, p)
+
+
+def product(values):
+    """
+    Product of a list of integers by binary splitting: the halves are
+    multiplied recursively, so the big-integer multiplications work on
+    operands of similar size.
+    """
+    values = list(values)
+    if not values:
+        return 1
+    while len(values) > 1:
+        paired = [values[i] * values[i + 1] for i in range(0, len(values) - 1, 2)]
+        if len(values) % 2:
+            paired.append(values[-1])
+        values = paired
+    return values[0]
+
+
+def product_range(a, b):
+    """
+    Product of the integers a, a + 1, ..., b - 1 by binary splitting.
+    """
+    if b - a <= 16:
+        result = 1
+        for i in range(a, b):
+            result *= i
+        return result
+    middle = (a + b) // 2
+    return product_range(a, middle) * product_range(middle, b)
+
+
+def _prime_power_product(primes, exponents):
+    """
+    Π pᵉ over all primes with positive exponent; equal exponents are grouped,
+    so that Π pᵉ = (Π p)ᵉ needs only one power per exponent.
+    """
+    positive = exponents > 0
+    primes, exponents = primes[positive], exponents[positive]
+    factors = []
+    for exponent in np.unique(exponents).tolist():
+        factors.append(product(primes[exponents == exponent].tolist()) ** exponent)
+    return product(factors)
+
+
+def _swing(n, primes):
+    """
+    Swing number n≀ = n! / ((n//2)!)²; the exponent of p is Σᵢ ⌊n / pⁱ⌋ mod 2.
+    """
+    primes = primes[primes <= n]
+    exponents = np.zeros(primes.size, dtype=np.int64)
+    power = primes.copy()
+    while True:
+        active = power <= n
+        if not active.any():
+            break
+        exponents[active] += (n // power[active]) % 2
+        power[active] *= primes[active]
+    return _prime_power_product(primes, exponents)
+
+
+def factorial(n):
+    """
+    Exact n! with the prime swing algorithm: n! = ((n//2)!)² · n≀.
+    """
+    if n < 0:
+        raise ValueError("factorial is not defined for negative numbers")
+    primes = primes_in_range(2, n + 1)
+    # (n//2)! rekursiv, aber iterativ aufgeschrieben: von innen nach außen
+    chain = []
+    while n >= 20:
+        chain.append(n)
+        n //= 2
+    result = product_range(1, n + 1)
+    for m in reversed(chain):
+        result = result * result * _swing(m, primes)
+    return result
+
+
+def binomial_exact(n, k):
+    """
+    Exact nCk from its prime factorisation: by Legendre's formula the
+    exponent of p is Σᵢ (⌊n/pⁱ⌋ - ⌊k/pⁱ⌋ - ⌊(n-k)/pⁱ⌋), i.e. the number of
+    carries when adding k and n - k in base p (Kummer).
+    """
+    if k < 0 or k > n:
+        return 0
+    k = min(k, n - k)
+    if k < 64:
+        return binomial_coefficient(n, k)
+    primes = primes_in_range(2, n + 1)
+    exponents = np.zeros(primes.size, dtype=np.int64)
+    power = primes.copy()
+    active = np.ones(primes.size, dtype=bool)
+    while active.any():
+        p_i = power[active]
+        exponents[active] += n // p_i - k // p_i - (n - k) // p_i
+        active &= power <= n // primes
+        power[active] *= primes[active]
+    return _prime_power_product(primes, exponents)
+
+
+def _factorial_loop(n):
+    # Referenz: Schleife wie in prod.py
+    result = 1
+    for i in range(1, n + 1):
+        result *= i
+    return result
+
+
+def benchmark_big(sizes=(1000, 10000, 100000, 1000000), naive_limit=100000):
+    """
+    Compares the naive loops with the prime factorisation for exact n! and
+    nC(n/2), with math.factorial / math.comb as reference.
+    """
+    print("Benchmark: exakte Werte für großes n (Zeiten in s)")
+    print(f"  {'n':>8s} {'n! Schleife':>12s} {'n! Swing':>10s} {'math':>8s} "
+          f"{'nCk Schleife':>13s} {'nCk Kummer':>11s} {'math':>8s}")
+    for n in sizes:
+        times = []
+        for function, args, naive in ((_factorial_loop, (n,), True), (factorial, (n,), False),
+                                      (math.factorial, (n,), False),
+                                      (binomial_coefficient, (n, n // 2), True),
+                                      (binomial_exact, (n, n // 2), False),
+                                      (math.comb, (n, n // 2), False)):
+            if naive and n > naive_limit:
+                times.append(float('nan'))
+                continue
+            start = perf_counter()
+            value = function(*args)
+            times.append(perf_counter() - start)
+            if function is math.factorial:
+                assert value == factorial(n)
+            elif function is math.comb:
+                assert value == binomial_exact(n, n // 2)
+        print(f"  {n:8d} {times[0]:12.4f} {times[1]:10.4f} {times[2]:8.4f} "
+              f"{times[3]:13.4f} {times[4]:11.4f} {times[5]:8.4f}")
+
+
+def benchmark(count=200000, n_max=3000, p=1_000_000_007):
+    """
+    Compares the product loop with the cache and the table for count random (n, k).
+    """
+    rng = np.random.default_rng(0)
+    n = rng.integers(0, n_max + 1, count)
+    k = (rng.random(count) * (n + 1)).astype(np.int64)
+    pairs = list(zip(n.tolist(), k.tolist()))
+    print(f"Benchmark: {count} Binomialkoeffizienten mit n ≤ {n_max}, modulo {p}")
+
+    start = perf_counter()
+    reference = [binomial_coefficient(a, b) % p for a, b in pairs[:count // 100]]
+    print(f"  Produktschleife:  {(perf_counter() - start) / (count // 100) * 1e6:10.2f} µs pro Aufruf")
+
+    cached = cached_binomial(maxsize=1 << 20)
+    for repetition in ('1. Durchlauf', '2. Durchlauf'):
+        start = perf_counter()
+        results = [cached(a, b) % p for a, b in pairs]
+        print(f"  Cache, {repetition}: {(perf_counter() - start) / count * 1e6:8.2f} µs pro Aufruf")
+
+    start = perf_counter()
+    table = BinomialTable(n_max, p)
+    print(f"  Tabellenaufbau:   {(perf_counter() - start) * 1e3:10.2f} ms")
+    start = perf_counter()
+    table_results = [table(a, b) for a, b in pairs]
+    print(f"  Tabelle:          {(perf_counter() - start) / count * 1e6:10.2f} µs pro Aufruf")
+    start = perf_counter()
+    batch_results = table.batch(n, k)
+    print(f"  Tabelle (NumPy):  {(perf_counter() - start) / count * 1e6:10.4f} µs pro Wert")
+    assert results[:len(reference)] == reference
+    assert table_results == results == batch_results.tolist()
+
+
+if __name__ == '__main__':
+    n = 49
+    k = 6
+    print(f"{n}C{k} = {binomial(n, k)}")
+    table = BinomialTable(1000)
+    print(f"1000C500 mod {table.p} = {table(1000, 500)}")
+    print(f"(10^18)C12345 mod 1009 = {binomial_lucas(10**18, 12345, 1009)}")
+    print(f"(10^10)C5 mod {table.p} = {binomial_mod(10**10, 5, table.p)}")
+    print(f"100000! hat {factorial(100000).bit_length()} Bits")
+    print()
+    benchmark()
+    print()
+    benchmark_big()
@@ -0,0 +1,313 @@
+"""
+Primfaktorzerlegung ohne sympy
+
+Anstatt jede Zahl einzeln an sympy.factorint zu übergeben (vgl.
+prime-factorization.py), kombiniert dieses Modul mehrere Verfahren:
+- Probedivision durch kleine Primzahlen aus dem segmentierten Sieb des
+  Eratosthenes (prime_sieve.py), die einmal berechnet und zwischengespeichert werden
+- Primzahltest nach Miller-Rabin (für n < 3,3 · 10²⁴ deterministisch)
+- Pollard-Rho in der Variante von Brent für Faktoren bis etwa 12 Stellen
+- Elliptische-Kurven-Methode (ECM) nach Lenstra für größere Faktoren
+Viele Zahlen können gemeinsam auf mehrere Prozesse verteilt zerlegt werden.
+"""
+
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+import numpy as np
+
+from combinatorics import product
+from prime_sieve import primes_in_range
+
+# zwischengespeicherte kleine Primzahlen (wächst bei Bedarf)
+_primes = np.array([2, 3, 5, 7], dtype=np.int64)
+_primes_limit = 10
+
+# mit diesen Basen ist Miller-Rabin für alle n < 3.317 · 10²⁴ exakt
+_MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+_MILLER_RABIN_LIMIT = 3317044064679887385961981
+
+# (b1, Kurven) der ECM für Faktoren mit etwa 15, 20, 25 und 30 Stellen
+_ECM_SCHEDULE = ((2000, 25), (11000, 90), (50000, 300), (250000, 700))
+
+
+def small_primes(limit):
+    """
+    All primes < limit from the segmented sieve of prime_sieve; the result is
+    cached, later calls only sieve the missing range.
+    """
+    global _primes, _primes_limit
+    if limit > _primes_limit:
+        _primes = np.concatenate([_primes, primes_in_range(_primes_limit, limit)])
+        _primes_limit = limit
+    return _primes[:np.searchsorted(_primes, limit)]
+
+
+def is_probable_prime(n):
+    """
+    Miller-Rabin test; exact for n < 3.3 · 10²⁴, otherwise with additional
+    random bases (error probability below 4⁻²⁰).
+    """
+    if n < 2:
+        return False
+    for p in _MILLER_RABIN_BASES:
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    bases = list(_MILLER_RABIN_BASES)
+    if n >= _MILLER_RABIN_LIMIT:
+        rng = random.Random(n)
+        bases += [rng.randrange(2, n - 1) for _ in range(20)]
+    for a in bases:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def pollard_brent(n, seed=1, max_steps=1 << 18):
+    """
+    Pollard's rho method in Brent's variant: returns a factor of the
+    composite number n (possibly n itself, then retry with another seed),
+    or None if none was found within about max_steps steps.
+    """
+    if n % 2 == 0:
+        return 2
+    rng = random.Random(seed)
+    y, c, m = rng.randrange(1, n), rng.randrange(1, n), 128
+    g = r = q = 1
+    while g == 1:
+        if r > max_steps:
+            return None
+        x = y
+        for _ in range(r):
+            y = (y * y + c) % n
+        k = 0
+        while k < r and g == 1:
+            ys = y
+            # m Schritte mit einem einzigen ggT (Produkt der Differenzen)
+            for _ in range(min(m, r - k)):
+                y = (y * y + c) % n
+                q = q * abs(x - y) % n
+            g = math.gcd(q, n)
+            k += m
+        r *= 2
+    if g == n:
+        # zu viel auf einmal: die letzten Schritte einzeln wiederholen
+        while True:
+            ys = (ys * ys + c) % n
+            g = math.gcd(abs(x - ys), n)
+            if g > 1:
+                break
+    return g
+
+
+def _add(p, q, diff, n):
+    """
+    Differential addition P + Q on a Montgomery curve in (x : z) coordinates, given P - Q.
+    """
+    u = (p[0] - p[1]) * (q[0] + q[1])
+    v = (p[0] + p[1]) * (q[0] - q[1])
+    return diff[1] * (u + v) ** 2 % n, diff[0] * (u - v) ** 2 % n
+
+
+def _double(p, a24, n):
+    """
+    Doubling 2P on a Montgomery curve with a24 = (A + 2) / 4.
+    """
+    s = (p[0] + p[1]) ** 2
+    d = (p[0] - p[1]) ** 2
+    t = s - d
+    return s * d % n, t * (d + a24 * t) % n
+
+
+def _multiply(k, p, a24, n):
+    """
+    Scalar multiple kP (k ≥ 1) with the Montgomery ladder.
+    """
+    r0, r1 = p, _double(p, a24, n)
+    for bit in bin(k)[3:]:
+        if bit == '1':
+            r0, r1 = _add(r1, r0, p, n), _double(r1, a24, n)
+        else:
+            r0, r1 = _double(r0, a24, n), _add(r1, r0, p, n)
+    return r0
+
+
+def ecm(n, b1, curves, seed=1):
+    """
+    Lenstra's elliptic curve method on Montgomery curves (Suyama's
+    parametrisation), stage 1 up to b1 and stage 2 up to 100 · b1.
+    Returns a non-trivial factor of the composite number n or None.
+    """
+    b2 = 100 * b1
+    # Stufe 1: Produkt aller Primzahlpotenzen ≤ b1 als ein einziger Skalar
+    k = product([p ** int(math.log(b1, p)) for p in small_primes(b1 + 1).tolist()])
+    stage2 = small_primes(b2)
+    stage2 = stage2[stage2 > b1].tolist()
+    d = max(1, math.isqrt(b2) // 2)
+    rng = random.Random(seed)
+    for _ in range(curves):
+        sigma = rng.randrange(6, n - 1)
+        u = (sigma * sigma - 5) % n
+        v = 4 * sigma % n
+        denominator = 16 * pow(u, 3, n) * v % n
+        g = math.gcd(denominator, n)
+        if g != 1:
+            if g != n:
+                return g
+            continue
+        a24 = pow(v - u, 3, n) * (3 * u + v) * pow(denominator, -1, n) % n
+        point = _multiply(k, (pow(u, 3, n), pow(v, 3, n)), a24, n)
+        g = math.gcd(point[1], n)
+        if g != 1:
+            if g != n:
+                return g
+            continue
+
+        # Stufe 2: Primzahlen q = r + 2δ mit Babysteps S[δ] = 2δ·Q und Riesenschritten R = r·Q
+        steps = [None, _double(point, a24, n)]
+        steps.append(_double(steps[1], a24, n))
+        for i in range(3, d + 1):
+            steps.append(_add(steps[i - 1], steps[1], steps[i - 2], n))
+        beta = [0] + [x * z % n for x, z in steps[1:]]
+        r = b1 if b1 % 2 else b1 - 1
+        previous = _multiply(r - 2 * d, point, a24, n) if r > 2 * d else None
+        current = _multiply(r, point, a24, n)
+        g = 1
+        i = 0
+        while i < len(stage2):
+            alpha = current[0] * current[1] % n
+            while i < len(stage2) and stage2[i] <= r + 2 * d:
+                delta = (stage2[i] - r) // 2
+                x, z = steps[delta]
+                # verschwindet modulo p genau dann, wenn q·Q = O (mod p)
+                g = g * ((current[0] - x) * (current[1] + z) - alpha + beta[delta]) % n
+                i += 1
+            if previous is None:
+                previous, current = current, _multiply(r + 2 * d, point, a24, n)
+            else:
+                previous, current = current, _add(current, steps[d], previous, n)
+            r += 2 * d
+        g = math.gcd(g, n)
+        if 1 < g < n:
+            return g
+    return None
+
+
+def _split(n):
+    """
+    A non-trivial factor of the composite number n: Pollard-Brent for small
+    factors first, then the elliptic curve method with growing bounds.
+    """
+    root = math.isqrt(n)
+    if root * root == n:
+        return root
+    for seed in range(1, 4):
+        divisor = pollard_brent(n, seed)
+        if divisor is not None and divisor != n:
+            return divisor
+    seed = 1
+    while True:
+        for b1, curves in _ECM_SCHEDULE:
+            divisor = ecm(n, b1, curves, seed)
+            if divisor is not None:
+                return divisor
+        seed += 1
+
+
+def factorize(n, trial_limit=10000):
+    """
+    Prime factorisation of n as dict {prime: exponent}, like sympy.factorint.
+    """
+    if n < 1:
+        raise ValueError("n must be a positive integer")
+    factors = {}
+    for p in small_primes(trial_limit).tolist():
+        if p * p > n:
+            break
+        while n % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+    composites = [n] if n > 1 else []
+    while composites:
+        m = composites.pop()
+        if m < trial_limit * trial_limit or is_probable_prime(m):
+            # nach der Probedivision hat m keine Primfaktoren < trial_limit
+            factors[m] = factors.get(m, 0) + 1
+            continue
+        divisor = _split(m)
+        composites += [divisor, m // divisor]
+    return dict(sorted(factors.items()))
+
+
+def factorize_batch(numbers, workers=None, chunksize=64):
+    """
+    Factorises many numbers in a pool of worker processes; returns the list
+    of factorisations in the order of numbers.
+    """
+    numbers = list(numbers)
+    if workers == 1 or len(numbers) < 2 * chunksize:
+        return [factorize(n) for n in numbers]
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(factorize, numbers, chunksize=chunksize))
+
+
+def benchmark(count=2000):
+    """
+    Compares factorize with sympy.factorint on the 90-digit number p · q of
+    prime-factorization.py and on a batch of random 64-bit numbers.
+    """
+    try:
+        from sympy import factorint
+    except ImportError:
+        factorint = None
+        print("sympy ist nicht installiert, es wird nur factorize gemessen")
+
+    n = (10**44 + 151) * (10**44 + 271)
+    rng = random.Random(0)
+    batch = [rng.getrandbits(64) for _ in range(count)]
+    print(f"Benchmark: p · q (90 Stellen) und {count} zufällige 64-Bit-Zahlen")
+    results = {}
+    for name, function in (('factorize', factorize), ('sympy.factorint', factorint)):
+        if function is None:
+            continue
+        start = perf_counter()
+        results[name] = function(n)
+        single_time = perf_counter() - start
+        start = perf_counter()
+        factorizations = [function(m) for m in batch]
+        batch_time = perf_counter() - start
+        print(f"  {name:16s}: p · q in {single_time:6.2f} s, "
+              f"Batch in {batch_time:6.2f} s ({count / batch_time:8.1f} Zahlen/s)")
+        assert all(math.prod(p ** e for p, e in f.items()) == m for f, m in zip(factorizations, batch))
+    start = perf_counter()
+    factorize_batch(batch)
+    batch_time = perf_counter() - start
+    print(f"  factorize_batch : Batch in {batch_time:6.2f} s ({count / batch_time:8.1f} Zahlen/s)")
+    if len(results) == 2:
+        assert results['factorize'] == results['sympy.factorint']
+
+
+if __name__ == '__main__':
+    print(factorize(24))
+    print(factorize(36))
+    print(factorize(1024))
+
+    p = 10**44 + 151  # 45-stellige Zahl
+    q = 10**44 + 271  # 45-stellige Zahl
+    print(p * q)
+    print(factorize(p * q))
+    print()
+    benchmark()
@@ -0,0 +1,211 @@
+"""
+ggT und kgV für viele Zahlen auf einmal
+
+Anders als number-theory.py, das ggT und kgV eines einzelnen Zahlenpaares
+berechnet, arbeitet dieses Modul mit ganzen Arrays:
+- gcd_pairs und lcm_pairs berechnen ggT bzw. kgV vieler Paare; passen die
+  Zahlen in 64 Bit, rechnet NumPy (np.gcd, np.lcm), sonst Python blockweise
+- gcd_all und lcm_all liefern ggT bzw. kgV einer ganzen Folge
+- batch_gcd findet nach Bernstein gemeinsame Primfaktoren unter vielen
+  großen Zahlen (etwa RSA-Moduln) über einen Multiplikationsbaum und einen
+  Restbaum, statt alle n² Paare einzeln zu vergleichen
+"""
+
+import math
+import random
+from collections.abc import Sequence
+from time import perf_counter
+
+import numpy as np
+
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+def _materialize(values):
+    """
+    values as sequence; iterators and generators are read only once.
+    """
+    return values if isinstance(values, (np.ndarray, Sequence)) else list(values)
+
+
+def _as_int64(values):
+    """
+    values as int64 array if all of them fit into 64 bits, otherwise None.
+    """
+    if not isinstance(values, np.ndarray):
+        values = list(values)
+        array = np.array(values)
+        if array.dtype.kind not in 'iu':
+            # z.B. float64 für [-1, 2**64 - 1]: die Elemente selbst prüfen
+            array = np.empty(len(values), dtype=object)
+            array[:] = values
+        values = array
+    if values.dtype.kind == 'i':
+        return values.astype(np.int64, copy=False)
+    if values.dtype.kind == 'u':
+        return values.astype(np.int64) if values.size == 0 or values.max() <= _INT64_MAX else None
+    if values.dtype.kind == 'O':
+        values = values.tolist()
+        if not all(isinstance(v, (int, np.integer)) for v in values):
+            raise TypeError("values must be integers")
+        try:
+            return np.array([int(v) for v in values], dtype=np.int64)
+        except OverflowError:
+            # Python-Zahlen, von denen mindestens eine nicht in 64 Bit passt
+            return None
+    raise TypeError("values must be integers")
+
+
+def gcd_pairs(a, b, chunk_size=1 << 16):
+    """
+    Elementwise greatest common divisor of the sequences a and b: int64 array
+    for fixed-width inputs, list of Python ints for big numbers.
+    """
+    a, b = _materialize(a), _materialize(b)
+    x, y = _as_int64(a), _as_int64(b)
+    if x is not None and y is not None:
+        return np.gcd(x, y)
+    a, b = list(a), list(b)
+    result = []
+    for start in range(0, len(a), chunk_size):
+        result += map(math.gcd, a[start:start + chunk_size], b[start:start + chunk_size])
+    return result
+
+
+def lcm_pairs(a, b):
+    """
+    Elementwise least common multiple of a and b. Uses np.lcm as long as the
+    results fit into int64; otherwise an object array of Python ints is returned.
+    """
+    a, b = _materialize(a), _materialize(b)
+    x, y = _as_int64(a), _as_int64(b)
+    if x is None or y is None:
+        result = np.empty(len(a), dtype=object)
+        result[:] = [math.lcm(i, j) for i, j in zip(a, b)]
+        return result
+    g = np.gcd(x, y)
+    factor = np.abs(x) // np.where(g == 0, 1, g)
+    # überlaufende Einträge erkennen: |x / g| · |y| > 2⁶³ - 1
+    overflow = (factor != 0) & (np.abs(y) > _INT64_MAX // np.maximum(factor, 1))
+    if not overflow.any():
+        return np.lcm(x, y)
+    result = np.lcm(x, y).astype(object)
+    for i in np.flatnonzero(overflow).tolist():
+        result[i] = math.lcm(int(x[i]), int(y[i]))
+    return result
+
+
+def gcd_all(values, chunk_size=1 << 16):
+    """
+    Greatest common divisor of a whole sequence; stops early once it is 1.
+    """
+    values = _materialize(values)
+    array = _as_int64(values)
+    if array is not None:
+        return int(np.gcd.reduce(array)) if array.size else 0
+    values = list(values)
+    g = 0
+    for start in range(0, len(values), chunk_size):
+        g = math.gcd(g, *values[start:start + chunk_size])
+        if g == 1:
+            break
+    return g
+
+
+def lcm_all(values):
+    """
+    Least common multiple of a whole sequence, reduced pairwise like a tree so
+    that the intermediate results stay balanced; exact for big results.
+    """
+    level = list(values)
+    if not level:
+        return 1
+    while len(level) > 1:
+        rest = level[-1:] if len(level) % 2 else []
+        level = lcm_pairs(level[0:len(level) - 1:2], level[1::2]).tolist() + rest
+    return abs(int(level[0]))
+
+
+def product_tree(values):
+    """
+    Levels of the product tree: level 0 are the values, every level above
+    contains the products of neighbouring pairs, the last level the total.
+    """
+    tree = [list(values)]
+    while len(tree[-1]) > 1:
+        level = tree[-1]
+        tree.append([level[i] * level[i + 1] for i in range(0, len(level) - 1, 2)]
+                    + ([level[-1]] if len(level) % 2 else []))
+    return tree
+
+
+def batch_gcd(moduli):
+    """
+    Bernstein's batch gcd: for every modulus n_i the gcd with the product of
+    all other moduli, computed as gcd(P mod n_i² / n_i, n_i) with a remainder
+    tree. Entries > 1 share a factor with another modulus.
+    """
+    moduli = [int(n) for n in moduli]
+    if not moduli:
+        return []
+    tree = product_tree(moduli)
+    remainders = tree[-1]
+    # Restbaum: jeder Knoten reduziert den Rest des Elternknotens modulo Knoten²
+    for level in reversed(tree[:-1]):
+        remainders = [remainders[i // 2] % (node * node) for i, node in enumerate(level)]
+    return [math.gcd(r // n, n) for r, n in zip(remainders, moduli)]
+
+
+def _random_prime(bits, rng):
+    from factorization import is_probable_prime
+
+    while True:
+        candidate = rng.getrandbits(bits) | (1 << (bits - 1)) | 1
+        if is_probable_prime(candidate):
+            return candidate
+
+
+def benchmark(count=10**6, num_moduli=2000, bits=128):
+    """
+    Compares the vectorized pair gcd with a loop over math.gcd, and batch_gcd
+    with the comparison of all pairs on moduli of which two share a prime.
+    """
+    rng = np.random.default_rng(0)
+    a = rng.integers(1, 2**62, count)
+    b = rng.integers(1, 2**62, count)
+    print(f"Benchmark: ggT von {count} Zahlenpaaren (64 Bit)")
+    start = perf_counter()
+    result = gcd_pairs(a, b)
+    vectorized_time = perf_counter() - start
+    start = perf_counter()
+    reference = [math.gcd(x, y) for x, y in zip(a.tolist(), b.tolist())]
+    loop_time = perf_counter() - start
+    assert result.tolist() == reference
+    print(f"  np.gcd: {vectorized_time:.3f} s, math.gcd in Schleife: {loop_time:.3f} s "
+          f"(Faktor {loop_time / vectorized_time:.1f})")
+
+    generator = random.Random(0)
+    primes = [_random_prime(bits, generator) for _ in range(2 * num_moduli - 1)]
+    moduli = [primes[2 * i] * primes[2 * i + 1] for i in range(num_moduli - 1)]
+    moduli.append(primes[0] * primes[-1])  # teilt den Faktor primes[0] mit moduli[0]
+    print(f"Benchmark: gemeinsame Faktoren unter {num_moduli} Moduln mit {2 * bits} Bit")
+    start = perf_counter()
+    shared = batch_gcd(moduli)
+    batch_time = perf_counter() - start
+    start = perf_counter()
+    pairs = [(i, j) for i in range(num_moduli) for j in range(i + 1, num_moduli)
+             if math.gcd(moduli[i], moduli[j]) > 1]
+    pairs_time = perf_counter() - start
+    assert [i for i, g in enumerate(shared) if g > 1] == sorted({k for pair in pairs for k in pair})
+    print(f"  batch_gcd: {batch_time:.3f} s, alle Paare: {pairs_time:.3f} s "
+          f"(Faktor {pairs_time / batch_time:.1f}), betroffene Moduln: {pairs}")
+
+
+if __name__ == '__main__':
+    print(gcd_pairs([4, 12, 35], [10, 18, 21]))
+    print(lcm_pairs([4, 12, 35], [10, 18, 21]))
+    print(lcm_pairs([2**40, 3**30], [3**25, 2**35]))
+    print(gcd_all([2**70 * 3, 2**65 * 9, 2**80]))
+    print(f"kgV(1, 2, ..., 100) = {lcm_all(range(1, 101))}")
+    print()
+    benchmark()
@@ -0,0 +1,175 @@
+"""
+Dublettenerkennung über normalisierte ISBN-13 Nummern
+
+Beim Zusammenführen von Katalogen werden alle ISBNs normalisiert, ISBN-10
+nach ISBN-13 umgerechnet und als 64-Bit-Ganzzahlen in einem sortierten
+NumPy-Array abgelegt, zusammen mit der Satznummer des Katalogdatensatzes.
+Suchen erfolgen per Binärsuche (np.searchsorted), Dubletten liegen im
+sortierten Array direkt hintereinander. Ein Eintrag belegt nur 16 Bytes
+(statt eines Python-Strings in einem Set), und der Index kann gespeichert
+und per Memory-Mapping wieder geladen werden.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from isbn_tools import to_isbn13
+
+INDEX_FORMAT = 'mgdbi-isbn-index'
+INDEX_VERSION = 1
+
+_POWERS_OF_10 = 10 ** np.arange(12, -1, -1, dtype=np.uint64)
+
+
+def isbn13_keys(isbns):
+    """
+    Normalises a batch of ISBN-10/ISBN-13 and returns (keys, valid):
+    the ISBN-13s as uint64 numbers and a mask of the valid entries
+    (invalid entries get key 0).
+    """
+    isbn13s, valid, _ = to_isbn13(isbns)
+    digits = isbn13s.view(np.uint8).reshape(-1, 13).astype(np.uint64) - ord('0')
+    keys = digits @ _POWERS_OF_10
+    keys[~valid] = 0
+    return keys, valid
+
+
+def keys_to_isbn13(keys):
+    """
+    Converts uint64 keys back into ISBN-13 strings.
+    """
+    return [f'{key:013d}' for key in np.asarray(keys).tolist()]
+
+
+class ISBNIndex:
+    """
+    Sorted uint64 ISBN-13 keys with the record id of every occurrence.
+    """
+
+    def __init__(self, keys=None, record_ids=None):
+        self.keys = np.empty(0, dtype=np.uint64) if keys is None else keys
+        self.record_ids = np.empty(0, dtype=np.int64) if record_ids is None else record_ids
+
+    def __len__(self):
+        return self.keys.size
+
+    def add(self, isbns, record_ids=None):
+        """
+        Bulk insert: normalises the ISBNs and merges the valid ones into the
+        index. record_ids defaults to consecutive numbers after the largest
+        existing id. Returns the mask of the valid (inserted) ISBNs.
+        """
+        keys, valid = isbn13_keys(isbns)
+        if record_ids is None:
+            first = int(self.record_ids.max()) + 1 if self.record_ids.size else 0
+            record_ids = np.arange(first, first + keys.size, dtype=np.int64)
+        record_ids = np.asarray(record_ids, dtype=np.int64)
+        if record_ids.shape != keys.shape:
+            raise ValueError("isbns and record_ids must have the same length")
+        keys, record_ids = keys[valid], record_ids[valid]
+        order = np.argsort(keys, kind='stable')
+        keys, record_ids = keys[order], record_ids[order]
+        # Einfügen in das sortierte Array in O(n + m) statt erneutem Sortieren
+        positions = np.searchsorted(self.keys, keys, side='right')
+        self.keys = np.insert(self.keys, positions, keys)
+        self.record_ids = np.insert(self.record_ids, positions, record_ids)
+        return valid
+
+    def count(self, isbns):
+        """
+        Number of occurrences of each ISBN in the index (0 for invalid ISBNs).
+        """
+        keys, valid = isbn13_keys(isbns)
+        counts = (np.searchsorted(self.keys, keys, side='right')
+                  - np.searchsorted(self.keys, keys, side='left'))
+        counts[~valid] = 0
+        return counts
+
+    def contains(self, isbns):
+        """
+        Membership test for a batch of ISBNs.
+        """
+        return self.count(isbns) > 0
+
+    def lookup(self, isbn):
+        """
+        Record ids of all occurrences of a single ISBN.
+        """
+        keys, valid = isbn13_keys([isbn])
+        if not valid[0]:
+            return self.record_ids[:0]
+        start = np.searchsorted(self.keys, keys[0], side='left')
+        stop = np.searchsorted(self.keys, keys[0], side='right')
+        return self.record_ids[start:stop]
+
+    def duplicates(self, min_count=2):
+        """
+        Duplicate groups as arrays (keys, indptr, record_ids): the group of
+        keys[i] consists of record_ids[indptr[i]:indptr[i + 1]].
+        """
+        if self.keys.size == 0:
+            return self.keys[:0], np.zeros(1, dtype=np.int64), self.record_ids[:0]
+        starts = np.flatnonzero(np.concatenate(([True], self.keys[1:] != self.keys[:-1])))
+        sizes = np.diff(np.append(starts, self.keys.size))
+        groups = sizes >= min_count
+        starts, sizes = starts[groups], sizes[groups]
+        indptr = np.zeros(starts.size + 1, dtype=np.int64)
+        np.cumsum(sizes, out=indptr[1:])
+        positions = np.repeat(starts - indptr[:-1], sizes) + np.arange(indptr[-1])
+        return self.keys[starts], indptr, self.record_ids[positions]
+
+    def duplicate_groups(self, min_count=2):
+        """
+        Yields (isbn13, record_ids) for every ISBN that occurs at least min_count times.
+        """
+        keys, indptr, record_ids = self.duplicates(min_count)
+        for key, start, stop in zip(keys_to_isbn13(keys), indptr[:-1], indptr[1:]):
+            yield key, record_ids[start:stop]
+
+    def save(self, path):
+        """
+        Saves the index as .npy files in the directory path.
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'keys.npy'), self.keys)
+        np.save(os.path.join(path, 'record_ids.npy'), self.record_ids)
+        with open(os.path.join(path, 'index.json'), 'w', encoding='utf-8') as f:
+            json.dump({'format': INDEX_FORMAT, 'version': INDEX_VERSION, 'size': int(self.keys.size)}, f)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """
+        Loads a saved index; with mmap_mode='r' the arrays are memory-mapped
+        read-only. add still works, since np.insert returns new arrays in
+        memory; the index then no longer shares pages with the files.
+        """
+        with open(os.path.join(path, 'index.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format') != INDEX_FORMAT or manifest.get('version') != INDEX_VERSION:
+            raise ValueError(f"{path} does not contain an ISBN index of version {INDEX_VERSION}")
+        return cls(np.load(os.path.join(path, 'keys.npy'), mmap_mode=mmap_mode),
+                   np.load(os.path.join(path, 'record_ids.npy'), mmap_mode=mmap_mode))
+
+
+if __name__ == '__main__':
+    from time import perf_counter
+
+    from isbn_tools import random_isbn13s
+
+    # zwei Kataloge mit teilweise gleichen Titeln in unterschiedlicher Schreibweise
+    index = ISBNIndex()
+    index.add(['3960091877', '978-3-86490-384-7', '978-3-446-46363-9'], record_ids=[101, 102, 103])
+    index.add(['978-3-96009-187-5', '3-86490-384-X', 'kaputt', '3-446-46363-1'], record_ids=[201, 202, 203, 204])
+    for isbn13, records in index.duplicate_groups():
+        print(f"Dublette {isbn13}: Datensätze {records.tolist()}")
+
+    count = 10000000
+    isbns = random_isbn13s(count)
+    start = perf_counter()
+    big = ISBNIndex()
+    big.add(isbns)
+    keys, indptr, _ = big.duplicates()
+    print(f"{count} ISBNs indexiert in {perf_counter() - start:.1f} s, "
+          f"{(big.keys.nbytes + big.record_ids.nbytes) / 2**20:.0f} MB, {keys.size} Dubletten")
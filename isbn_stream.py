@@ -0,0 +1,195 @@
+"""
+Bereinigung großer ISBN-Bestände als Datenstrom
+
+Liest zeilenorientierte Dateien (eine ISBN pro Zeile) oder MARC-Exporte im
+Textformat (Feld =020 mit Unterfeld $a) blockweise mit konstantem
+Speicherbedarf. Jede ISBN wird normalisiert (ohne Bindestriche und
+Leerzeichen), validiert und nach ISBN-13 oder ISBN-10 umgerechnet; die
+bereinigten ISBNs werden zeilenweise ausgegeben, ungültige (und bei ISBN-10
+nicht umrechenbare) Einträge optional mit Fehlergrund in eine separate Datei
+geschrieben.
+Große Dateien können in Abschnitte zerlegt und auf mehreren Prozessoren
+gleichzeitig bearbeitet werden.
+
+Beispiel:
+    python isbn_stream.py katalog.mrk isbn13.txt --marc --rejects fehler.txt --workers 8
+"""
+
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from isbn_tools import ERROR_MESSAGES, to_isbn10, to_isbn13
+
+# $a-Unterfeld des Feldes 020 in MARC-Textexporten (z.B. "=020  \\$a3-86490-384-X (kart.)")
+_MARC_020 = re.compile(rb'^=020 [^$\n]*(?:\$[^a][^$\n]*)*\$a([0-9Xx\- ]+)', re.MULTILINE)
+
+
+def read_blocks(f, block_size=1 << 22):
+    """
+    Yields blocks of about block_size bytes from a binary file that end at a line boundary.
+    """
+    rest = b''
+    while True:
+        data = f.read(block_size)
+        if not data:
+            break
+        data = rest + data
+        cut = data.rfind(b'\n') + 1
+        if cut == 0:
+            rest = data
+            continue
+        rest = data[cut:]
+        yield data[:cut]
+    if rest:
+        yield rest
+
+
+def clean_block(block, target='13', marc=False):
+    """
+    Cleans the ISBNs of one block. Returns (output, rejects, num_valid, num_invalid);
+    output contains one converted ISBN per line, rejects the invalid entries
+    with their error reason separated by a tab.
+    """
+    if marc:
+        entries = _MARC_020.findall(block)
+    else:
+        entries = [line for line in block.splitlines() if line.strip()]
+    if not entries:
+        return b'', b'', 0, 0
+    convert = to_isbn13 if target == '13' else to_isbn10
+    isbns, ok, reasons = convert(entries)
+    output = b'\n'.join(isbns[ok].tolist())
+    if output:
+        output += b'\n'
+    bad = np.flatnonzero(~ok)
+    rejects = b''.join(entries[i].strip() + b'\t' + ERROR_MESSAGES[int(reasons[i])].encode() + b'\n'
+                       for i in bad)
+    return output, rejects, int(np.count_nonzero(ok)), int(bad.size)
+
+
+def clean_stream(infile, outfile, target='13', marc=False, rejects=None, block_size=1 << 22):
+    """
+    Cleans a binary input stream block by block and writes to the binary outfile
+    (and rejects, if given). Returns (num_valid, num_invalid).
+    """
+    num_valid = num_invalid = 0
+    for block in read_blocks(infile, block_size):
+        output, rejected, valid, invalid = clean_block(block, target, marc)
+        outfile.write(output)
+        if rejects is not None:
+            rejects.write(rejected)
+        num_valid += valid
+        num_invalid += invalid
+    return num_valid, num_invalid
+
+
+def _split_points(path, num_parts):
+    """
+    Byte offsets that split the file into num_parts sections at line boundaries.
+    """
+    size = os.path.getsize(path)
+    points = [0]
+    with open(path, 'rb') as f:
+        for part in range(1, num_parts):
+            f.seek(max(size * part // num_parts, points[-1]))
+            f.readline()
+            points.append(min(f.tell(), size))
+    points.append(size)
+    return sorted(set(points))
+
+
+class _Section:
+    """
+    Read-only file-like view of the bytes start..stop of a file.
+    """
+
+    def __init__(self, f, start, stop):
+        self._f = f
+        self._remaining = stop - start
+        f.seek(start)
+
+    def read(self, size):
+        data = self._f.read(min(size, self._remaining))
+        self._remaining -= len(data)
+        return data
+
+
+def _clean_section(path, start, stop, out_path, rejects_path, target, marc, block_size):
+    with open(path, 'rb') as f, open(out_path, 'wb') as out:
+        rejects = open(rejects_path, 'wb') if rejects_path else None
+        try:
+            return clean_stream(_Section(f, start, stop), out, target, marc, rejects, block_size)
+        finally:
+            if rejects is not None:
+                rejects.close()
+
+
+def clean_file(path, out_path, target='13', marc=False, rejects_path=None, workers=1, block_size=1 << 22):
+    """
+    Cleans the file path into out_path. With workers > 1 the file is split into
+    sections at line boundaries, which are cleaned in parallel processes into
+    temporary files and concatenated in their original order.
+    Returns (num_valid, num_invalid).
+    """
+    if workers <= 1:
+        with open(path, 'rb') as f, open(out_path, 'wb') as out:
+            rejects = open(rejects_path, 'wb') if rejects_path else None
+            try:
+                return clean_stream(f, out, target, marc, rejects, block_size)
+            finally:
+                if rejects is not None:
+                    rejects.close()
+
+    points = _split_points(path, workers)
+    with tempfile.TemporaryDirectory() as tmp:
+        parts = [(os.path.join(tmp, f'{i}.out'), os.path.join(tmp, f'{i}.rej') if rejects_path else None)
+                 for i in range(len(points) - 1)]
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(_clean_section, path, start, stop, out_part, rejects_part,
+                                   target, marc, block_size)
+                       for (start, stop), (out_part, rejects_part) in zip(zip(points, points[1:]), parts)]
+            counts = [future.result() for future in futures]
+        for final_path, index in ((out_path, 0), (rejects_path, 1)):
+            if final_path is None:
+                continue
+            with open(final_path, 'wb') as out:
+                for part in parts:
+                    with open(part[index], 'rb') as f:
+                        shutil.copyfileobj(f, out)
+    return sum(valid for valid, _ in counts), sum(invalid for _, invalid in counts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Normalisiert, validiert und konvertiert ISBNs.")
+    parser.add_argument('input', help="Eingabedatei ('-' für die Standardeingabe)")
+    parser.add_argument('output', help="Ausgabedatei ('-' für die Standardausgabe)")
+    parser.add_argument('--to', choices=['13', '10'], default='13', help="Zielformat (Standard: ISBN-13)")
+    parser.add_argument('--marc', action='store_true', help="MARC-Textexport, ISBNs aus Feld 020 $a lesen")
+    parser.add_argument('--rejects', help="Datei für ungültige Einträge mit Fehlergrund")
+    parser.add_argument('--workers', type=int, default=1, help="Anzahl paralleler Prozesse")
+    args = parser.parse_args(argv)
+
+    if args.input == '-' or args.output == '-':
+        infile = sys.stdin.buffer if args.input == '-' else open(args.input, 'rb')
+        outfile = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+        rejects = open(args.rejects, 'wb') if args.rejects else None
+        try:
+            valid, invalid = clean_stream(infile, outfile, args.to, args.marc, rejects)
+        finally:
+            for f in (infile, outfile, rejects):
+                if f is not None and f not in (sys.stdin.buffer, sys.stdout.buffer):
+                    f.close()
+    else:
+        valid, invalid = clean_file(args.input, args.output, args.to, args.marc, args.rejects, args.workers)
+    print(f"{valid} ISBNs ausgegeben, {invalid} abgewiesen", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
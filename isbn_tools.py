@@ -0,0 +1,313 @@
+"""
+Validierung großer Mengen von ISBN-10 und ISBN-13 Nummern in einem Durchgang
+
+Anstatt jede ISBN Zeichen für Zeichen in einer Python-Schleife zu prüfen
+(wie in isbn-validator.py und isbn13-validator.py), werden alle ISBNs als
+Zeilen einer Byte-Matrix abgelegt. Die gewichteten Prüfziffern werden dann
+mit NumPy für alle Zeilen gleichzeitig berechnet:
+- ISBN-10: Gewichte 1, 2, ..., 10 und Rest bei Division durch 11 gleich 0
+  (X an letzter Stelle steht für 10)
+- ISBN-13: Gewichte 1, 3, 1, 3, ... und Rest bei Division durch 10 gleich 0
+Zurückgegeben wird eine Maske der gültigen ISBNs und je ISBN ein Fehlercode.
+Außerdem werden ISBNs normalisiert (Bindestriche, Leerzeichen und das Präfix
+"ISBN" entfernt) und zwischen ISBN-10 und ISBN-13 (Präfix 978) umgerechnet.
+"""
+
+import os
+from time import perf_counter
+
+import numpy as np
+
+# Fehlercodes
+VALID = 0
+WRONG_LENGTH = 1
+INVALID_CHARACTER = 2
+WRONG_CHECK_DIGIT = 3
+NO_ISBN10 = 4
+
+ERROR_MESSAGES = {
+    VALID: 'valid',
+    WRONG_LENGTH: 'wrong length',
+    INVALID_CHARACTER: 'invalid character',
+    WRONG_CHECK_DIGIT: 'wrong check digit',
+    NO_ISBN10: '979 prefix, no ISBN-10 exists',
+}
+
+# ein Byte mehr als die längste ISBN, damit zu lange Einträge erkannt werden
+_WIDTH = 14
+
+# Platz für Schreibweisen wie "ISBN 978-3-86490-384-7" vor dem Normalisieren
+_RAW_WIDTH = 32
+
+_WEIGHTS_10 = np.arange(1, 11, dtype=np.int16)
+_WEIGHTS_13 = np.tile(np.array([1, 3], dtype=np.int16), 7)[:13]
+
+
+def _read_lines(source):
+    if hasattr(source, 'read'):
+        data = source.read()
+    else:
+        with open(source, 'rb') as f:
+            data = f.read()
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return data.splitlines()
+
+
+def to_byte_matrix(isbns, width=_WIDTH):
+    """
+    Converts a batch of ISBNs into an (n, width) uint8 matrix, padded with zero bytes.
+    isbns is a single str or bytes, a list of str or bytes, a NumPy str or
+    bytes array, or a path (os.PathLike, e.g. pathlib.Path) or an open file
+    with one ISBN per line.
+    """
+    if isinstance(isbns, os.PathLike) or hasattr(isbns, 'read'):
+        isbns = _read_lines(isbns)
+    elif isinstance(isbns, (str, bytes)):
+        isbns = [isbns]
+    try:
+        array = np.asarray(isbns, dtype=f'S{width}')
+    except UnicodeEncodeError:
+        # Nicht-ASCII-Zeichen sind in ISBNs ohnehin ungültig
+        array = np.array([isbn.encode('ascii', 'replace') if isinstance(isbn, str) else isbn
+                          for isbn in isbns], dtype=f'S{width}')
+    array = np.ascontiguousarray(array.reshape(-1))
+    return array.view(np.uint8).reshape(-1, width)
+
+
+def _validate(matrix, length, weights, modulus, allow_x):
+    lengths = np.count_nonzero(matrix, axis=1)
+    digits = matrix[:, :length].astype(np.int16) - ord('0')
+    is_digit = (digits >= 0) & (digits <= 9)
+    if allow_x:
+        # X (oder x) ist nur als letzte Stelle erlaubt und steht für 10
+        last = matrix[:, length - 1]
+        is_x = (last == ord('X')) | (last == ord('x'))
+        digits[is_x, length - 1] = 10
+        is_digit[:, length - 1] |= is_x
+    checksum = (np.where(is_digit, digits, 0) * weights).sum(axis=1) % modulus
+
+    reasons = np.full(matrix.shape[0], WRONG_CHECK_DIGIT, dtype=np.uint8)
+    reasons[checksum == 0] = VALID
+    reasons[~is_digit.all(axis=1)] = INVALID_CHARACTER
+    reasons[lengths != length] = WRONG_LENGTH
+    return reasons == VALID, reasons
+
+
+def validate_isbn10(isbns):
+    """
+    Validates a batch of ISBN-10s. Returns (valid, reasons): a boolean mask
+    and an array of error codes (see ERROR_MESSAGES).
+    """
+    return _validate(to_byte_matrix(isbns), 10, _WEIGHTS_10, 11, allow_x=True)
+
+
+def validate_isbn13(isbns):
+    """
+    Validates a batch of ISBN-13s. Returns (valid, reasons) like validate_isbn10.
+    """
+    return _validate(to_byte_matrix(isbns), 13, _WEIGHTS_13, 10, allow_x=False)
+
+
+def validate_isbns(isbns):
+    """
+    Validates a mixed batch: entries with 10 characters are checked as ISBN-10,
+    all others as ISBN-13. Returns (valid, reasons) like validate_isbn10.
+    """
+    matrix = to_byte_matrix(isbns)
+    is_isbn10 = np.count_nonzero(matrix, axis=1) == 10
+    valid = np.empty(matrix.shape[0], dtype=bool)
+    reasons = np.empty(matrix.shape[0], dtype=np.uint8)
+    valid[is_isbn10], reasons[is_isbn10] = _validate(matrix[is_isbn10], 10, _WEIGHTS_10, 11, allow_x=True)
+    valid[~is_isbn10], reasons[~is_isbn10] = _validate(matrix[~is_isbn10], 13, _WEIGHTS_13, 10, allow_x=False)
+    return valid, reasons
+
+
+def _compact(matrix, drop):
+    """
+    Removes the dropped bytes of every row and moves the remaining ones to the front.
+    """
+    rows = np.flatnonzero(drop.any(axis=1))
+    if rows.size == 0:
+        return matrix
+    keep = ~drop[rows]
+    # neue Spalte jedes behaltenen Bytes = Anzahl behaltener Bytes links davon
+    target_rows, _ = np.nonzero(keep)
+    target_cols = (np.cumsum(keep, axis=1) - 1)[keep]
+    compacted = np.zeros((rows.size, matrix.shape[1]), dtype=matrix.dtype)
+    compacted[target_rows, target_cols] = matrix[rows][keep]
+    matrix[rows] = compacted
+    return matrix
+
+
+def normalize(isbns):
+    """
+    Removes hyphens, spaces and a leading "ISBN" / "ISBN:" and upper-cases x.
+    Returns a NumPy bytes array. Entries longer than 32 bytes are not cut off
+    but returned as their first 14 bytes, so that they fail validation with
+    WRONG_LENGTH.
+    """
+    # ein Byte mehr als erlaubt, damit zu lange Einträge nicht unbemerkt abgeschnitten werden
+    matrix = to_byte_matrix(isbns, width=_RAW_WIDTH + 1)
+    too_long = matrix[:, _RAW_WIDTH] != 0
+    raw = matrix[too_long, :_WIDTH].copy()
+    lower = (matrix >= ord('a')) & (matrix <= ord('z'))
+    matrix[lower] -= ord('a') - ord('A')
+    matrix = _compact(matrix, np.isin(matrix, np.frombuffer(b'- \t\r', np.uint8)))
+    prefix = np.all(matrix[:, :4] == np.frombuffer(b'ISBN', np.uint8), axis=1)
+    drop = np.zeros(matrix.shape, dtype=bool)
+    drop[prefix, :4] = True
+    drop[prefix, 4] = matrix[prefix, 4] == ord(':')
+    matrix = _compact(matrix, drop)
+    result = np.ascontiguousarray(matrix[:, :_WIDTH])
+    result[too_long] = raw
+    return result.view(f'S{_WIDTH}').reshape(-1)
+
+
+def _digit_matrix(matrix, length):
+    digits = matrix[:, :length].astype(np.int16) - ord('0')
+    return np.clip(digits, 0, 10)
+
+
+def _isbn13_check_digits(digits):
+    # Prüfziffer so, dass Σ Gewicht · Ziffer durch 10 teilbar ist
+    return (10 - (digits[:, :12] * _WEIGHTS_13[:12]).sum(axis=1) % 10) % 10
+
+
+def _isbn10_check_digits(digits):
+    # 10 · d ≡ -S (mod 11) und 10 ≡ -1, also d ≡ S (mod 11); 10 wird als X geschrieben
+    return (digits[:, :9] * _WEIGHTS_10[:9]).sum(axis=1) % 11
+
+
+def to_isbn13(isbns):
+    """
+    Normalises a batch and converts valid ISBN-10s to ISBN-13 (prefix 978,
+    recomputed check digit); valid ISBN-13s are kept. Returns (isbn13s, valid,
+    reasons); invalid entries are returned as empty bytes.
+    """
+    matrix = to_byte_matrix(normalize(isbns))
+    valid, reasons = validate_isbns(matrix.view(f'S{_WIDTH}').reshape(-1))
+    is_isbn10 = valid & (np.count_nonzero(matrix, axis=1) == 10)
+
+    result = matrix[:, :13].copy()
+    digits = np.zeros((np.count_nonzero(is_isbn10), 13), dtype=np.int16)
+    digits[:, :3] = [9, 7, 8]
+    digits[:, 3:12] = _digit_matrix(matrix[is_isbn10], 9)
+    digits[:, 12] = _isbn13_check_digits(digits)
+    result[is_isbn10] = digits + ord('0')
+    result[~valid] = 0
+    return result.view('S13').reshape(-1), valid, reasons
+
+
+def to_isbn10(isbns):
+    """
+    Normalises a batch and converts valid ISBN-13s with prefix 978 to ISBN-10;
+    valid ISBN-10s are kept. Returns (isbn10s, convertible, reasons); entries
+    that are invalid or have a 979 prefix (no ISBN-10 exists) are returned as
+    empty bytes and marked False in convertible; valid ISBN-13s with prefix
+    979 get the reason NO_ISBN10.
+    """
+    matrix = to_byte_matrix(normalize(isbns))
+    valid, reasons = validate_isbns(matrix.view(f'S{_WIDTH}').reshape(-1))
+    lengths = np.count_nonzero(matrix, axis=1)
+    is_isbn13 = valid & (lengths == 13)
+    convertible = (valid & (lengths == 10)) | (is_isbn13 & np.all(matrix[:, :3] == np.frombuffer(b'978', np.uint8),
+                                                                    axis=1))
+    result = matrix[:, :10].copy()
+    rows = convertible & is_isbn13
+    digits = _digit_matrix(matrix[rows, 3:], 10)
+    check = _isbn10_check_digits(digits)
+    digits[:, 9] = check
+    characters = (digits + ord('0')).astype(np.uint8)
+    characters[check == 10, 9] = ord('X')
+    result[rows] = characters
+    result[~convertible] = 0
+    reasons[valid & ~convertible] = NO_ISBN10
+    return result.view('S10').reshape(-1), convertible, reasons
+
+
+def isbn10_to_isbn13(isbn10):
+    """
+    Converts a single ISBN-10 (hyphens allowed) into an ISBN-13.
+    """
+    isbn13s, valid, reasons = to_isbn13([isbn10])
+    if not valid[0]:
+        raise ValueError(f"{isbn10!r} is not a valid ISBN-10: {ERROR_MESSAGES[int(reasons[0])]}")
+    return isbn13s[0].decode()
+
+
+def isbn13_to_isbn10(isbn13):
+    """
+    Converts a single ISBN-13 with prefix 978 (hyphens allowed) into an ISBN-10.
+    """
+    isbn10s, convertible, reasons = to_isbn10([isbn13])
+    if not convertible[0]:
+        raise ValueError(f"{isbn13!r} cannot be converted to an ISBN-10: {ERROR_MESSAGES[int(reasons[0])]}")
+    return isbn10s[0].decode()
+
+
+def explain(reasons):
+    """
+    Returns the error messages for an array of error codes.
+    """
+    return [ERROR_MESSAGES[int(reason)] for reason in reasons]
+
+
+def _is_valid_isbn13_loop(isbn13):
+    # Referenz: Schleife wie in isbn13-validator.py
+    if len(isbn13) != 13 or not isbn13.isdigit():
+        return False
+    total = 0
+    for i, digit in enumerate(isbn13):
+        total += int(digit) * (1 if i % 2 == 0 else 3)
+    return total % 10 == 0
+
+
+def random_isbn13s(count, seed=0):
+    """
+    Generates count random ISBN-13s (978/979 prefix), about 10 % with a wrong check digit.
+    """
+    rng = np.random.default_rng(seed)
+    digits = rng.integers(0, 10, (count, 13))
+    digits[:, :3] = [9, 7, 8]
+    digits[rng.random(count) < 0.5, 2] = 9
+    digits[:, 12] = (10 - (digits[:, :12] * _WEIGHTS_13[:12]).sum(axis=1) % 10) % 10
+    wrong = rng.random(count) < 0.1
+    digits[wrong, 12] = (digits[wrong, 12] + 1) % 10
+    return (digits + ord('0')).astype(np.uint8).view('S13').reshape(-1)
+
+
+def benchmark(count=1000000):
+    """
+    Compares the throughput of the vectorized validation with a per-character loop.
+    """
+    isbns = random_isbn13s(count)
+    print(f"Benchmark: {count} ISBN-13")
+
+    start = perf_counter()
+    valid, reasons = validate_isbn13(isbns)
+    elapsed = perf_counter() - start
+    print(f"  vektorisiert:   {count / elapsed:12,.0f} ISBNs/s ({np.count_nonzero(valid)} gültig)")
+
+    sample = [isbn.decode() for isbn in isbns[:100000]]
+    start = perf_counter()
+    valid_loop = [_is_valid_isbn13_loop(isbn) for isbn in sample]
+    elapsed = perf_counter() - start
+    print(f"  Python-Schleife: {len(sample) / elapsed:11,.0f} ISBNs/s")
+    assert valid_loop == valid[:len(sample)].tolist()
+
+
+if __name__ == '__main__':
+    isbns = ['3960091877', '9783864903847', '3-86490-384-X', '386490384X', '9783864903848', '39600918']
+    valid, reasons = validate_isbns(isbns)
+    for isbn, message in zip(isbns, explain(reasons)):
+        print(f"{isbn}: {message}")
+    print(f"3-86490-384-X als ISBN-13: {isbn10_to_isbn13('3-86490-384-X')}")
+    print(f"978-3-96009-187-5 als ISBN-10: {isbn13_to_isbn10('978-3-96009-187-5')}")
+    try:
+        isbn13_to_isbn10('979-10-90636-07-1')
+    except ValueError as error:
+        print(error)
+
+    print()
+    benchmark()
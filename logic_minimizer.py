@@ -0,0 +1,304 @@
+"""
+Minimierung aussagenlogischer Formeln mit vielen Variablen
+
+simplify_logic aus sympy (vgl. simplify_logic_formula.py) wird ab etwa 8
+Variablen sehr langsam. Dieses Modul berechnet die Minterme der Formel mit
+den Bitvektoren aus truth_tables.py und minimiert dann die disjunktive
+Normalform (DNF):
+- exakt für wenige Variablen: Quine-McCluskey bestimmt alle Primimplikanten,
+  die Methode von Petrick wählt eine kleinste Überdeckung
+- heuristisch für viele Variablen, wie Espresso: jeder noch nicht überdeckte
+  Minterm wird zu einem möglichst großen Würfel erweitert (EXPAND), danach
+  werden überflüssige Würfel entfernt (IRREDUNDANT)
+Die konjunktive Normalform (KNF) ergibt sich aus der minimierten DNF der
+Negation mit den Gesetzen von De Morgan.
+Ein Würfel ist ein Paar (value, dashes) von Bitmasken über die Variablen:
+in dashes gesetzte Bits sind frei ("-"), die übrigen Bits von value geben
+den Wert der Variablen an (die erste Variable ist das höchstwertige Bit).
+"""
+
+from time import perf_counter
+
+import numpy as np
+from sympy import false, symbols, true
+from sympy.logic.boolalg import And, Not, Or, simplify_logic
+
+from truth_tables import compile_formula, random_formula
+
+# bis zu dieser Anzahl Variablen wird exakt minimiert
+EXACT_LIMIT = 10
+
+# höchstens so viele Teilüberdeckungen beim Ausmultiplizieren nach Petrick
+_PETRICK_LIMIT = 5000
+
+
+def _popcount(x):
+    return bin(x).count('1')
+
+
+def prime_implicants(minterms, dontcares=()):
+    """
+    All prime implicants of the function with the given minterms and
+    don't-cares (Quine-McCluskey), as list of cubes (value, dashes).
+    """
+    # Würfel mit gleichen freien Stellen, die sich in genau einem Bit unterscheiden, verschmelzen
+    current = {0: set(int(m) for m in minterms) | set(int(d) for d in dontcares)}
+    primes = []
+    while current:
+        merged = {}
+        for dashes, values in current.items():
+            used = set()
+            for value in values:
+                rest = value
+                while rest:
+                    bit = rest & -rest
+                    rest ^= bit
+                    if value ^ bit in values:
+                        merged.setdefault(dashes | bit, set()).add(value & ~bit)
+                        used.add(value)
+                        used.add(value ^ bit)
+            primes += [(value, dashes) for value in values - used]
+        # Bits, die 0 sind, werden vom Partner mit der 1 aus gefunden
+        current = merged
+    return primes
+
+
+def cube_minterms(cube):
+    """
+    All minterms (row numbers) covered by the cube as int64 array.
+    """
+    value, dashes = cube
+    rows = np.array([value], dtype=np.int64)
+    rest = dashes
+    while rest:
+        bit = rest & -rest
+        rest ^= bit
+        rows = np.concatenate([rows, rows | bit])
+    return rows
+
+
+def _literal_count(cube, num_variables):
+    return num_variables - _popcount(cube[1])
+
+
+def _petrick(chart, primes, num_variables):
+    """
+    Minimal cover of the remaining minterms with Petrick's method; chart maps
+    every minterm to the indices of the primes covering it. Falls back to a
+    greedy cover if the expansion becomes too large.
+    """
+    products = {frozenset()}
+    for covering in sorted(set(frozenset(c) for c in chart.values()), key=len):
+        expanded = set()
+        for term in products:
+            if term & covering:
+                expanded.add(term)
+            else:
+                expanded.update(term | {p} for p in covering)
+        # Absorption: Obermengen anderer Terme streichen
+        products = {t for t in expanded if not any(o < t for o in expanded)}
+        if len(products) > _PETRICK_LIMIT:
+            return _greedy_cover(chart, primes, num_variables)
+    return min(products, key=lambda t: (len(t), sum(_literal_count(primes[p], num_variables) for p in t)))
+
+
+def _greedy_cover(chart, primes, num_variables):
+    uncovered = set(chart)
+    chosen = set()
+    while uncovered:
+        best = max({p for m in uncovered for p in chart[m]},
+                   key=lambda p: (sum(p in chart[m] for m in uncovered), -_literal_count(primes[p], num_variables)))
+        chosen.add(best)
+        uncovered = {m for m in uncovered if best not in chart[m]}
+    return chosen
+
+
+def minimize_exact(minterms, num_variables, dontcares=()):
+    """
+    Minimal DNF as list of cubes: prime implicants by Quine-McCluskey,
+    essential primes first, then Petrick's method for the rest.
+    """
+    minterms = set(int(m) for m in minterms)
+    if not minterms:
+        return []
+    primes = prime_implicants(minterms, dontcares)
+    chart = {m: set() for m in minterms}
+    for i, prime in enumerate(primes):
+        for m in cube_minterms(prime).tolist():
+            if m in chart:
+                chart[m].add(i)
+    chosen = {next(iter(c)) for c in chart.values() if len(c) == 1}  # essentielle Primimplikanten
+    rest = {m: c for m, c in chart.items() if not c & chosen}
+    if rest:
+        chosen |= _petrick(rest, primes, num_variables)
+    return sorted(primes[i] for i in chosen)
+
+
+def minimize_heuristic(on, dontcare=None):
+    """
+    Espresso-like heuristic minimisation. on (and dontcare) are boolean arrays
+    over all 2ⁿ rows; returns a list of cubes covering exactly the on-set
+    (plus possibly don't-cares).
+    """
+    num_variables = on.size.bit_length() - 1
+    allowed = on | dontcare if dontcare is not None else on
+    uncovered = on.copy()
+    cover = []
+    # EXPAND: jeden noch nicht überdeckten Minterm zu einem großen Würfel erweitern
+    for m in np.flatnonzero(on).tolist():
+        if not uncovered[m]:
+            continue
+        value, dashes, rows = m, 0, np.array([m], dtype=np.int64)
+        candidates = [1 << b for b in range(num_variables)]
+        while candidates:
+            best = None
+            for bit in candidates:
+                grown = rows ^ bit
+                if allowed[grown].all():
+                    gain = int(np.count_nonzero(uncovered[grown]))
+                    if best is None or gain > best[0]:
+                        best = (gain, bit, grown)
+            if best is None:
+                break
+            _, bit, grown = best
+            value &= ~bit
+            dashes |= bit
+            rows = np.concatenate([rows, grown])
+            candidates.remove(bit)
+        cover.append((value, dashes))
+        uncovered[rows] = False
+
+    # IRREDUNDANT: Würfel entfernen, deren Minterme alle von anderen überdeckt werden
+    counts = np.zeros(on.size, dtype=np.int32)
+    rows = [cube_minterms(cube) for cube in cover]
+    for r in rows:
+        counts[r] += 1
+    keep = []
+    for i in sorted(range(len(cover)), key=lambda i: rows[i].size):
+        r = rows[i][on[rows[i]]]
+        if r.size and counts[r].min() >= 2:
+            counts[rows[i]] -= 1
+        else:
+            keep.append(i)
+    return sorted(cover[i] for i in keep)
+
+
+def _literal(variable, positive):
+    return variable if positive else Not(variable)
+
+
+def cubes_to_expr(cubes, variables, form='dnf'):
+    """
+    sympy expression of a cube cover: DNF as Or of And terms; with form='cnf'
+    the cubes are the cover of the negation and are turned into clauses.
+    """
+    n = len(variables)
+    terms = []
+    for value, dashes in cubes:
+        literals = [(variables[i], bool(value >> (n - 1 - i) & 1)) for i in range(n)
+                    if not dashes >> (n - 1 - i) & 1]
+        if form == 'dnf':
+            terms.append(And(*(_literal(v, positive) for v, positive in literals)))
+        else:
+            terms.append(Or(*(_literal(v, not positive) for v, positive in literals)))
+    return Or(*terms) if form == 'dnf' else And(*terms)
+
+
+def minimize(expr, variables=None, form='dnf', dontcare=None, method='auto'):
+    """
+    Minimised DNF or CNF of expr like simplify_logic(expr, form=...).
+    method is 'exact', 'heuristic' or 'auto' (exact up to EXACT_LIMIT variables);
+    dontcare is an optional formula of the rows whose value does not matter.
+    """
+    if form not in ('dnf', 'cnf'):
+        raise ValueError("form must be 'dnf' or 'cnf'")
+    compiled = compile_formula(expr, variables)
+    variables = compiled.variables
+    n = len(variables)
+    on = np.concatenate([values for _, values in compiled.iter_chunks(1 << 22)])
+    dc = None
+    if dontcare is not None:
+        dc = np.concatenate([values for _, values in compile_formula(dontcare, variables).iter_chunks(1 << 22)])
+        on &= ~dc
+    if form == 'cnf':
+        on = ~on if dc is None else ~on & ~dc
+    if not on.any():
+        return false if form == 'dnf' else true
+    if on.all() or (dc is not None and (on | dc).all()):
+        return true if form == 'dnf' else false
+    if method == 'auto':
+        method = 'exact' if n <= EXACT_LIMIT else 'heuristic'
+    if method == 'exact':
+        cubes = minimize_exact(np.flatnonzero(on), n, np.flatnonzero(dc) if dc is not None else ())
+    elif method == 'heuristic':
+        cubes = minimize_heuristic(on, dc)
+    else:
+        raise ValueError("method must be 'auto', 'exact' or 'heuristic'")
+    return cubes_to_expr(cubes, variables, form)
+
+
+def equivalent(expr1, expr2, variables):
+    """
+    Whether both formulas have the same truth table (compared as bitsets).
+    """
+    return all(np.array_equal(a, b) for (_, a), (_, b) in zip(compile_formula(expr1, variables).iter_packed(),
+                                                             compile_formula(expr2, variables).iter_packed()))
+
+
+def _literals(expr):
+    return sum(len(term.args) if isinstance(term, (And, Or)) else 1 for term in Or.make_args(expr))
+
+
+def random_rules(num_variables, num_rules=8, seed=0):
+    """
+    Random rule condition: a disjunction of conjunctions of a few literals,
+    similar to generated rule conditions.
+    """
+    rng = np.random.default_rng(seed)
+    variables = list(symbols(f'x0:{num_variables}'))
+    rules = []
+    for _ in range(num_rules):
+        chosen = rng.choice(num_variables, rng.integers(2, 5), replace=False)
+        rules.append(And(*(_literal(variables[i], rng.random() < 0.5) for i in chosen)))
+    return Or(*rules), variables
+
+
+def benchmark(small=(6, 8, 10, 12), large=(12, 16, 20)):
+    """
+    Compares minimize with sympy's simplify_logic on random CNF formulas, and
+    minimises redundant rule conditions with up to 20 variables.
+    """
+    print("Benchmark: Minimierung zur DNF, Anzahl Literale in Klammern")
+    for n in small:
+        expr, variables = random_formula(n, num_clauses=n)
+        start = perf_counter()
+        reference = simplify_logic(expr, form='dnf', force=True)
+        sympy_time = perf_counter() - start
+        start = perf_counter()
+        result = minimize(expr, variables)
+        own_time = perf_counter() - start
+        assert equivalent(result, expr, variables)
+        print(f"  {n:2d} Variablen: simplify_logic {sympy_time:7.3f} s ({_literals(reference)}), "
+              f"minimize {own_time:7.3f} s ({_literals(result)})")
+    for n in large:
+        expr, variables = random_rules(n, seed=n)
+        # redundante Regel ergänzen: Teilfall einer vorhandenen Regel
+        first = expr.args[0]
+        expr = Or(expr, And(first, variables[-1]))
+        start = perf_counter()
+        result = minimize(expr, variables)
+        own_time = perf_counter() - start
+        assert equivalent(result, expr, variables)
+        print(f"  {n:2d} Variablen: minimize {own_time:7.3f} s, "
+              f"{_literals(expr)} → {_literals(result)} Literale")
+
+
+if __name__ == '__main__':
+    A, B, C = symbols('A B C')
+    # Aussage 1: (¬A ∧ ¬B ∧ ¬C) ∨ (¬A ∧ ¬B ∧ C) ∨ (A ∧ B ∧ ¬C)
+    expr = Or(And(Not(A), Not(B), Not(C)), And(Not(A), Not(B), C), And(A, B, Not(C)))
+    print("Originalaussage:", expr)
+    print("Vereinfachte Aussage (DNF):", minimize(expr, [A, B, C], form='dnf'))
+    print("Vereinfachte Aussage (KNF):", minimize(expr, [A, B, C], form='cnf'))
+    print()
+    benchmark()
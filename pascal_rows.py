@@ -0,0 +1,118 @@
+"""
+Pascalsches Dreieck zeilenweise mit begrenztem Speicherbedarf
+
+Im Pascalschen Dreieck entspricht der Eintrag in der n-ten Zeile und k-ten
+Spalte dem Binomialkoeffizienten "n über k" (nCk). Anders als in
+pascals-triangle.py wird nicht das ganze Dreieck als Liste von Listen
+gespeichert:
+- rows liefert die Zeilen nacheinander und hält nur die vorherige Zeile
+- rows_inplace aktualisiert eine einzige Liste von rechts nach links
+- row berechnet Zeile n direkt über nC(k+1) = nCk · (n-k) / (k+1)
+- rows_mod und row_mod rechnen modulo p mit NumPy-Arrays; für p = 2
+  entsteht das Sierpinski-Dreieck
+"""
+
+import numpy as np
+
+
+def rows(n=None):
+    """
+    Yields the rows 0, 1, ..., n-1 (endlessly for n=None) as new lists;
+    only the previous row is kept.
+    """
+    row = [1]
+    i = 0
+    while n is None or i < n:
+        yield row
+        row = [1] + [a + b for a, b in zip(row, row[1:])] + [1]
+        i += 1
+
+
+def rows_inplace(n=None):
+    """
+    Like rows, but updates a single list in place: every yielded row is the
+    same list object, which is overwritten by the next row (copy it to keep it).
+    """
+    row = []
+    i = 0
+    while n is None or i < n:
+        # von rechts nach links, damit row[j - 1] noch aus der vorherigen Zeile stammt
+        row.append(1)
+        for j in range(i - 1, 0, -1):
+            row[j] += row[j - 1]
+        yield row
+        i += 1
+
+
+def row(n):
+    """
+    Row n directly, without the rows 0..n-1; only half of the row is
+    computed, the other half follows from the symmetry nCk = nC(n-k).
+    """
+    half = [1]
+    for k in range(n // 2):
+        half.append(half[-1] * (n - k) // (k + 1))
+    return half + half[::-1][n % 2 == 0:]
+
+
+def rows_mod(n, p):
+    """
+    Yields the rows 0..n-1 modulo p as NumPy arrays (dtype uint8 for p ≤ 128,
+    int64 otherwise); row i needs only the previous row.
+    """
+    dtype = np.uint8 if p <= 128 else np.int64
+    row = np.ones(1, dtype=dtype)
+    for i in range(n):
+        yield row
+        next_row = np.empty(i + 2, dtype=dtype)
+        next_row[0] = next_row[-1] = 1 % p
+        np.add(row[:-1], row[1:], out=next_row[1:-1])
+        next_row[1:-1] %= p
+        row = next_row
+
+
+def row_mod(n, p):
+    """
+    Row n modulo a prime p directly with the theorem of Lucas: nCk mod p is
+    the product of the binomial coefficients of the base-p digits of n and k.
+    Computed for all k at once; p should be small (a p × p table is used).
+    """
+    table = np.zeros((p, p), dtype=np.int64)
+    for i, values in enumerate(rows_mod(p, p)):
+        table[i, :i + 1] = values
+    k = np.arange(n + 1, dtype=np.int64)
+    result = np.ones(n + 1, dtype=np.int64)
+    while n:
+        n, n_digit = divmod(n, p)
+        k, k_digit = np.divmod(k, p)
+        result = result * table[n_digit, k_digit] % p
+    return result
+
+
+def print_triangle(n):
+    """
+    Prints the rows 0..n-1 centered; the width of the last row is computed directly.
+    """
+    max_width = len(' '.join(map(str, row(n - 1)))) if n > 0 else 0
+    for values in rows(n):
+        print(' '.join(map(str, values)).center(max_width))
+
+
+def sierpinski(n, p=2):
+    """
+    Yields the rows 0..n-1 as text: '*' for entries not divisible by p.
+    """
+    for values in rows_mod(n, p):
+        yield ' '.join('*' if value else ' ' for value in values.tolist()).center(2 * n - 1)
+
+
+if __name__ == '__main__':
+    print_triangle(20)
+    print()
+    for line in sierpinski(32):
+        print(line)
+    print()
+    n = 20000
+    odd = np.count_nonzero(row_mod(n, 2))
+    print(f"Zeile {n} enthält {odd} ungerade Einträge (= 2^{bin(n).count('1')})")
+    print(f"Summe der Einträge von Zeile {n} modulo 7: {int(row_mod(n, 7).sum() % 7)}")
@@ -0,0 +1,212 @@
+"""
+Segmentiertes Sieb des Eratosthenes für Primzahlen bis 10¹²
+
+Das Sieb speichert nur ungerade Zahlen, ein Bit pro Zahl (16 Zahlen pro
+Byte). Gesiebt wird blockweise in Abschnitten, die in den Cache des
+Prozessors passen, mit den Basisprimzahlen bis √b; der Speicherbedarf hängt
+daher nur von der Blockgröße ab, nicht von der oberen Grenze b.
+- primes_in_range(a, b) liefert alle Primzahlen im Intervall [a, b)
+- count_primes(a, b) zählt sie, ohne sie zu speichern
+Blöcke können auf mehrere Prozesse verteilt und in einem Verzeichnis
+gespeichert werden, aus dem sie bei späteren Läufen per Memory-Mapping
+gelesen werden.
+"""
+
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+from time import perf_counter
+
+import numpy as np
+
+CACHE_FORMAT = 'mgdbi-prime-sieve'
+CACHE_VERSION = 1
+
+# 2^18 ungerade Zahlen pro Block: 256 KB beim Sieben, 32 KB gepackt
+BLOCK_SIZE = 1 << 18
+
+# Primzahlen unterhalb dieser Grenze werden per Slice gestrichen, größere vektorisiert
+_SLICE_LIMIT = 4096
+
+
+@lru_cache(maxsize=8)
+def _base_primes(limit):
+    """
+    Odd primes ≤ limit (simple sieve, limit is at most about 10⁶).
+    """
+    is_prime = np.ones(limit // 2 + 1, dtype=bool)  # Index i steht für 2i + 1
+    is_prime[0] = False
+    for i in range(1, (math.isqrt(limit) - 1) // 2 + 1):
+        if is_prime[i]:
+            p = 2 * i + 1
+            is_prime[p * p // 2::p] = False
+    return 2 * np.flatnonzero(is_prime[:(limit - 1) // 2 + 1]) + 1
+
+
+def sieve_block(index, block_size=BLOCK_SIZE, base_primes=None):
+    """
+    Sieves block number index: a boolean array over the odd numbers
+    2j + 1 for j in [index · block_size, (index + 1) · block_size).
+    """
+    first = index * block_size
+    low = 2 * first + 1
+    high = 2 * (first + block_size)
+    if base_primes is None:
+        base_primes = _base_primes(math.isqrt(high))
+    primes = base_primes[:np.searchsorted(base_primes, math.isqrt(high), side='right')]
+    is_prime = np.ones(block_size, dtype=bool)
+    if index == 0:
+        is_prime[0] = False  # 1 ist keine Primzahl
+
+    # erstes ungerades Vielfaches ≥ max(p², low) jeder Primzahl als Index im Block
+    start = np.maximum(primes * primes, (low + primes - 1) // primes * primes)
+    start += primes * (start % 2 == 0)
+    offset = (start - 1) // 2 - first
+
+    small = np.searchsorted(primes, _SLICE_LIMIT)
+    for p, o in zip(primes[:small].tolist(), offset[:small].tolist()):
+        is_prime[o::p] = False
+    # große Primzahlen treffen den Block nur wenige Male: alle Treffer auf einmal
+    primes, offset = primes[small:], offset[small:]
+    hits = np.maximum((block_size - offset + primes - 1) // primes, 0)
+    steps = np.arange(hits.sum()) - np.repeat(np.cumsum(hits) - hits, hits)
+    is_prime[np.repeat(offset, hits) + np.repeat(primes, hits) * steps] = False
+    return is_prime
+
+
+def _sieve_packed(index, block_size, limit):
+    return np.packbits(sieve_block(index, block_size, _base_primes(limit)))
+
+
+class SieveCache:
+    """
+    Directory of sieved blocks, one bit-packed .npy file per block, which is
+    read back memory-mapped.
+    """
+
+    def __init__(self, path, block_size=BLOCK_SIZE):
+        self.path = path
+        self.block_size = block_size
+        os.makedirs(path, exist_ok=True)
+        manifest_path = os.path.join(path, 'sieve.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('format') != CACHE_FORMAT or manifest.get('version') != CACHE_VERSION:
+                raise ValueError(f"{path} does not contain a prime sieve cache of version {CACHE_VERSION}")
+            if manifest['block_size'] != block_size:
+                raise ValueError(f"{path} was written with block_size={manifest['block_size']}")
+        else:
+            with open(manifest_path, 'w', encoding='utf-8') as f:
+                json.dump({'format': CACHE_FORMAT, 'version': CACHE_VERSION, 'block_size': block_size}, f)
+
+    def _file(self, index):
+        return os.path.join(self.path, f'{index:08d}.npy')
+
+    def load(self, index):
+        """
+        The packed block index, or None if it has not been cached yet.
+        """
+        try:
+            return np.load(self._file(index), mmap_mode='r')
+        except FileNotFoundError:
+            return None
+
+    def save(self, index, packed):
+        # erst unter anderem Namen schreiben, damit parallele Läufe keine halben Dateien lesen
+        temporary = self._file(index) + f'.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as f:
+            np.save(f, packed)
+        os.replace(temporary, self._file(index))
+
+
+def iter_blocks(a, b, workers=1, cache=None, block_size=BLOCK_SIZE):
+    """
+    Yields (first, is_prime) for the odd numbers in [a, b), block by block:
+    is_prime[i] tells whether 2 · (first + i) + 1 is prime.
+    """
+    if b <= a or b <= 1:
+        return
+    if cache is not None:
+        block_size = cache.block_size
+    lo, hi = a // 2, b // 2  # ungerade Zahlen 2j + 1 mit lo ≤ j < hi
+    if lo >= hi:
+        return
+    first_block, last_block = lo // block_size, (hi - 1) // block_size
+    limit = math.isqrt(2 * (last_block + 1) * block_size)
+    batch = 4 * max(1, workers)
+    pool = ProcessPoolExecutor(workers) if workers > 1 else None
+    try:
+        for start in range(first_block, last_block + 1, batch):
+            indices = range(start, min(start + batch, last_block + 1))
+            packed = {index: cache.load(index) for index in indices} if cache is not None else {}
+            missing = [index for index in indices if packed.get(index) is None]
+            if pool is not None and len(missing) > 1:
+                computed = pool.map(_sieve_packed, missing, repeat(block_size), repeat(limit))
+            else:
+                computed = map(_sieve_packed, missing, repeat(block_size), repeat(limit))
+            for index, bits in zip(missing, computed):
+                packed[index] = bits
+                if cache is not None:
+                    cache.save(index, bits)
+            for index in indices:
+                is_prime = np.unpackbits(packed[index], count=block_size).view(bool)
+                offset = index * block_size
+                begin, end = max(lo - offset, 0), min(hi - offset, block_size)
+                yield offset + begin, is_prime[begin:end]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def primes_in_range(a, b, workers=1, cache=None):
+    """
+    All primes p with a ≤ p < b as int64 array.
+    """
+    parts = [np.array([2], dtype=np.int64)] if a <= 2 < b else []
+    for first, is_prime in iter_blocks(a, b, workers, cache):
+        parts.append(2 * (np.flatnonzero(is_prime) + first) + 1)
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+def count_primes(a, b, workers=1, cache=None):
+    """
+    Number of primes p with a ≤ p < b (for a = 0 the prime counting function π(b - 1)).
+    """
+    count = 1 if a <= 2 < b else 0
+    for _, is_prime in iter_blocks(a, b, workers, cache):
+        count += int(np.count_nonzero(is_prime))
+    return count
+
+
+def benchmark(workers=None):
+    """
+    Counts primes in ranges of growing size and below 10¹²; repeats one
+    range with a cache to show the reuse.
+    """
+    import tempfile
+
+    workers = workers or os.cpu_count()
+    print(f"Benchmark: Primzahlen zählen ({workers} Prozesse)")
+    for a, b in ((0, 10**8), (0, 10**9), (10**12 - 10**8, 10**12)):
+        start = perf_counter()
+        count = count_primes(a, b, workers)
+        print(f"  [{a}, {b}): {count} Primzahlen in {perf_counter() - start:.2f} s")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SieveCache(tmp)
+        for run in ('erster Lauf', 'aus dem Cache'):
+            start = perf_counter()
+            count = count_primes(10**11, 10**11 + 10**8, workers, cache)
+            print(f"  [10^11, 10^11 + 10^8) {run}: {count} Primzahlen in {perf_counter() - start:.2f} s")
+
+
+if __name__ == '__main__':
+    print(primes_in_range(0, 100))
+    print(primes_in_range(10**12, 10**12 + 200))
+    for exponent in range(1, 10):
+        print(f"π(10^{exponent}) = {count_primes(0, 10**exponent)}")
+    print()
+    benchmark()
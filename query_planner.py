@@ -0,0 +1,279 @@
+"""
+Übersetzung aussagenlogischer Formeln in Anfragepläne für Mengenoperationen
+
+In logic2sets.py stehen logical_formula und set_formula für eine Aussage
+von Hand nebeneinander. Hier wird eine beliebige Formel aus sympy (wie in
+truth-table.py) automatisch in einen Plan aus Mengenoperationen auf den
+Bitmaps aus roaring_sets.py übersetzt, z.B. für viele Facettenanfragen an
+einen Katalog:
+- die Formel wird in Negationsnormalform gebracht, Komplemente werden zu
+  Differenzen: A ∧ ¬B wird A \\ B statt A ∩ (X \\ B), und A ∨ ¬B wird
+  X \\ (B \\ A), so dass höchstens einmal von der Grundmenge X abgezogen wird
+- Schnittmengen werden nach geschätzter Mächtigkeit sortiert (kleinste
+  zuerst, Schätzung unter Annahme unabhängiger Facetten), Differenzen mit
+  der größten abzuziehenden Menge zuerst
+- gleiche Teilausdrücke bekommen denselben Planknoten, ihre Ergebnisse
+  werden über alle Anfragen hinweg zwischengespeichert
+"""
+
+from collections import OrderedDict
+from functools import reduce
+from time import perf_counter
+
+import numpy as np
+from sympy import Symbol, symbols
+from sympy.logic.boolalg import And, BooleanFalse, BooleanTrue, Not, Or
+
+from roaring_sets import Bitmap, evaluate
+
+_SYMBOLS = {'and': '∩', 'or': '∪', 'andnot': '\\'}
+
+# höchstens so viele Bytes an Zwischenergebnissen werden aufbewahrt
+CACHE_BYTES = 256 * 2**20
+
+
+class QueryPlanner:
+    """
+    Compiles sympy formulas over named subsets of universe into plans of set
+    operations and evaluates them; plan nodes are shared between all queries
+    of the planner, their results are kept in an LRU cache of at most
+    cache_bytes bytes.
+    """
+
+    def __init__(self, sets, universe, cache_bytes=CACHE_BYTES):
+        self.sets = {Symbol(k) if isinstance(k, str) else k: v for k, v in sets.items()}
+        self.universe = universe
+        self.cache_bytes = cache_bytes
+        self.hits = 0
+        self.clear()
+
+    def _node(self, op, args, estimate):
+        key = (op, args)
+        if key not in self._ids:
+            self._ids[key] = len(self.nodes)
+            self.nodes.append(key)
+            self.estimates.append(estimate)
+        return self._ids[key]
+
+    def _set(self, symbol):
+        if symbol not in self.sets:
+            raise KeyError(f"no set for variable {symbol}")
+        return self._node('set', (symbol,), self.sizes[symbol])
+
+    def _universe(self):
+        return self._node('universe', (), self.universe_size)
+
+    def _and(self, ids):
+        """
+        Intersection chain, smallest estimated operands first.
+        """
+        ids = sorted(set(ids), key=lambda i: (self.estimates[i], i))
+        result = ids[0]
+        for i in ids[1:]:
+            estimate = self.estimates[result] * self.estimates[i] / self.universe_size
+            result = self._node('and', (result, i), estimate)
+        return result
+
+    def _or(self, ids):
+        ids = sorted(set(ids), key=lambda i: (self.estimates[i], i))
+        result = ids[0]
+        for i in ids[1:]:
+            a, b = self.estimates[result], self.estimates[i]
+            result = self._node('or', (result, i), min(a + b - a * b / self.universe_size, self.universe_size))
+        return result
+
+    def _andnot(self, a, b):
+        estimate = self.estimates[a] * (1 - self.estimates[b] / self.universe_size)
+        return self._node('andnot', (a, b), estimate)
+
+    def _compile(self, expr):
+        """
+        Plan node of a formula in negation normal form.
+        """
+        if isinstance(expr, BooleanTrue):
+            return self._universe()
+        if isinstance(expr, BooleanFalse):
+            return self._node('empty', (), 0)
+        if isinstance(expr, Symbol):
+            return self._set(expr)
+        if isinstance(expr, Not):
+            return self._andnot(self._universe(), self._set(expr.args[0]))
+        positives = [self._compile(arg) for arg in expr.args if not isinstance(arg, Not)]
+        negatives = [self._set(arg.args[0]) for arg in expr.args if isinstance(arg, Not)]
+        if isinstance(expr, And):
+            # A ∩ B ∩ ¬C ∩ ¬D = ((A ∩ B) \ C) \ D
+            result = self._and(positives) if positives else self._universe()
+            for i in sorted(set(negatives), key=lambda i: (-self.estimates[i], i)):
+                result = self._andnot(result, i)
+            return result
+        if isinstance(expr, Or):
+            if not negatives:
+                return self._or(positives)
+            # A ∪ B ∪ ¬C ∪ ¬D = X \ ((C ∩ D) \ (A ∪ B))
+            inner = self._and(negatives)
+            if positives:
+                inner = self._andnot(inner, self._or(positives))
+            return self._andnot(self._universe(), inner)
+        raise TypeError(f"unexpected expression in negation normal form: {expr}")
+
+    def plan(self, expr):
+        """
+        Root node of the plan for expr.
+        """
+        return self._compile(expr.to_nnf(simplify=False))
+
+    def explain(self, expr):
+        """
+        The plan of expr as readable text, one operation per line.
+        """
+        lines, done = [], set()
+
+        def visit(i):
+            if i in done:
+                return
+            done.add(i)
+            op, args = self.nodes[i]
+            if op == 'set':
+                text = str(args[0])
+            elif op in ('universe', 'empty'):
+                text = 'X' if op == 'universe' else '∅'
+            else:
+                for arg in args:
+                    visit(arg)
+                text = f"#{args[0]} {_SYMBOLS[op]} #{args[1]}"
+            cached = ", zwischengespeichert" if i in self.results else ""
+            lines.append(f"#{i} = {text}  (≈ {self.estimates[i]:.0f}{cached})")
+
+        visit(self.plan(expr))
+        return "\n".join(lines)
+
+    def _execute(self, i):
+        op, args = self.nodes[i]
+        if op == 'set':
+            return self.sets[args[0]]
+        if op == 'universe':
+            return self.universe
+        if op == 'empty':
+            return Bitmap()
+        if i in self.results:
+            self.hits += 1
+            self.results.move_to_end(i)
+            return self.results[i]
+        left = self._execute(args[0])
+        if not left.containers and op != 'or':
+            result = left  # leere Menge: rechter Teil wird nicht berechnet
+        elif op == 'and':
+            result = left & self._execute(args[1])
+        elif op == 'or':
+            result = left | self._execute(args[1])
+        else:
+            result = left - self._execute(args[1])
+        self._store(i, result)
+        return result
+
+    def _store(self, i, result):
+        """
+        Caches a result and drops the least recently used ones beyond cache_bytes.
+        """
+        size = result.nbytes
+        if size > self.cache_bytes:
+            return
+        self.results[i] = result
+        self.cached_bytes += size
+        while self.cached_bytes > self.cache_bytes:
+            _, dropped = self.results.popitem(last=False)
+            self.cached_bytes -= dropped.nbytes
+
+    def evaluate(self, expr):
+        """
+        Bitmap of all elements of the universe for which expr holds.
+        """
+        return self._execute(self.plan(expr))
+
+    def clear(self):
+        """
+        Drops the plans and cached results and recomputes the cardinalities,
+        e.g. after the sets or the universe have changed.
+        """
+        self.universe_size = max(len(self.universe), 1)
+        self.sizes = {symbol: len(bitmap) for symbol, bitmap in self.sets.items()}
+        # Planknoten (Operation, Argumente) mit geschätzter Mächtigkeit
+        self.nodes = []
+        self.estimates = []
+        self._ids = {}
+        self.results = OrderedDict()
+        self.cached_bytes = 0
+
+
+def evaluate_naive(expr, sets, universe):
+    """
+    Left-to-right evaluation of a formula with And, Or and Not, every
+    complement as universe \\ set, for comparison.
+    """
+    if isinstance(expr, Symbol):
+        return sets[expr]
+    if isinstance(expr, Not):
+        return universe - evaluate_naive(expr.args[0], sets, universe)
+    parts = [evaluate_naive(arg, sets, universe) for arg in expr.args]
+    return reduce(lambda a, b: a & b, parts) if isinstance(expr, And) else reduce(lambda a, b: a | b, parts)
+
+
+def random_facet_queries(facets, count=100, seed=0):
+    """
+    Random facet queries: a disjunction of languages, some required facets and one excluded facet.
+    """
+    rng = np.random.default_rng(seed)
+    languages = [f for f in facets if f.name.startswith('lang')]
+    others = [f for f in facets if not f.name.startswith('lang')]
+    queries = []
+    for _ in range(count):
+        chosen = rng.choice(len(others), 3, replace=False)
+        required = [others[i] for i in chosen[:rng.integers(1, 3)]]
+        spoken = [languages[i] for i in rng.choice(len(languages), rng.integers(1, 3), replace=False)]
+        excluded = Not(others[chosen[-1]])
+        queries.append(And(Or(*spoken), *required, excluded))
+    return queries
+
+
+def benchmark(size=10_000_000, count=100, seed=0):
+    """
+    Evaluates count random facet queries over a universe of size record ids:
+    naively from left to right, in one pass per query (roaring_sets.evaluate)
+    and with the planner, whose cache is shared between the queries.
+    """
+    rng = np.random.default_rng(seed)
+    ids = np.flatnonzero(rng.random(size) < 0.97)
+    shares = {'available': 0.6, 'lang_de': 0.3, 'lang_en': 0.5, 'lang_fr': 0.05, 'ebook': 0.2, 'print': 0.7,
+              'open_access': 0.1, 'since_2020': 0.25, 'rare_manuscript': 0.001}
+    X = Bitmap.from_ids(ids)
+    sets = {Symbol(name): Bitmap.from_ids(ids[rng.random(ids.size) < share]) for name, share in shares.items()}
+    queries = random_facet_queries(list(sets), count, seed)
+    print(f"Benchmark: {count} Facettenanfragen über {len(X)} Datensätze")
+
+    start = perf_counter()
+    naive = [evaluate_naive(q, sets, X) for q in queries]
+    naive_time = perf_counter() - start
+    start = perf_counter()
+    one_pass = [evaluate(q, sets, X) for q in queries]
+    one_pass_time = perf_counter() - start
+    planner = QueryPlanner(sets, X)
+    start = perf_counter()
+    planned = [planner.evaluate(q) for q in queries]
+    planned_time = perf_counter() - start
+    assert naive == one_pass == planned
+    print(f"  von links nach rechts {naive_time:.3f} s, ein Durchlauf {one_pass_time:.3f} s, "
+          f"Plan mit Zwischenspeicher {planned_time:.3f} s")
+    print(f"  {len(planner.nodes)} Planknoten, {planner.hits} Treffer im Zwischenspeicher, "
+          f"{len(planner.results)} Ergebnisse mit {planner.cached_bytes / 2**20:.1f} MB aufbewahrt")
+
+
+if __name__ == '__main__':
+    # Beispiel aus logic2sets.py
+    A, B = symbols('A B')
+    expr = Or(And(A, B), Not(A))
+    planner = QueryPlanner({A: Bitmap.from_ids({1, 2}), B: Bitmap.from_ids({2, 3, 5})}, Bitmap.from_ids({1, 2, 3, 4, 5}))
+    print(f"Plan für {expr}:")
+    print(planner.explain(expr))
+    print("Ergebnis:", set(planner.evaluate(expr)))
+    print()
+    benchmark()
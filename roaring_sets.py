@@ -0,0 +1,366 @@
+"""
+Mengenalgebra mit komprimierten Bitmaps für große Grundmengen
+
+logic2sets.py übersetzt die Aussage (A ∧ B) ∨ (¬A) in die Mengenformel
+(A ∩ B) ∪ (X \\ A) und rechnet mit Python-Mengen über einer Grundmenge mit
+fünf Elementen. Für Grundmengen mit zig Millionen Elementen (etwa alle
+Datensätze eines Katalogs, A = "verfügbar", B = "deutschsprachig") werden die
+Teilmengen hier wie bei Roaring-Bitmaps gespeichert: die oberen 16 Bit eines
+Elements wählen einen Container, der die unteren 16 Bit enthält, entweder als
+sortiertes uint16-Array (bis 4096 Elemente) oder als Bitmap aus 1024
+64-Bit-Wörtern. Eine beliebige aussagenlogische Formel aus sympy wird nicht
+Operation für Operation ausgewertet (jede Zwischenmenge vollständig
+aufgebaut), sondern in einem Durchlauf über die Container: für einen Block
+von Containern werden alle Operationen der Formel mit bitweisen Operationen
+auf den Wörtern ausgeführt (¬A entspricht X \\ A) und nur das Ergebnis
+gespeichert.
+"""
+
+from time import perf_counter
+
+import numpy as np
+from sympy import Symbol, symbols
+from sympy.logic.boolalg import And, Not, Or
+
+from truth_tables import apply_instruction, compile_formula
+
+# höchstens so viele Elemente in einem Array-Container, darüber Bitmap (8 KB)
+ARRAY_LIMIT = 4096
+
+# Anzahl Container, die bei der Auswertung einer Formel gemeinsam verarbeitet werden
+BLOCK_KEYS = 64
+
+_WORDS = 1024
+
+
+def _dense(container):
+    """
+    Container as bitmap of 1024 uint64 words.
+    """
+    if container.dtype == np.uint64:
+        return container
+    bits = np.zeros(1 << 16, dtype=bool)
+    bits[container] = True
+    return np.packbits(bits, bitorder='little').view('<u8')
+
+
+def _probe(array, words):
+    """
+    Which elements of an array container are set in a bitmap container.
+    """
+    return (words[array >> 6] >> (array & 63).astype(np.uint64) & np.uint64(1)).astype(bool)
+
+
+def _cardinality(container):
+    return container.size if container.dtype == np.uint16 else int(np.bitwise_count(container).sum())
+
+
+_ARRAY_OPS = {
+    'and': lambda a, b: np.intersect1d(a, b, assume_unique=True),
+    'or': np.union1d,
+    'andnot': lambda a, b: np.setdiff1d(a, b, assume_unique=True),
+    'xor': lambda a, b: np.setxor1d(a, b, assume_unique=True),
+}
+
+_WORD_OPS = {
+    'and': lambda a, b: a & b,
+    'or': lambda a, b: a | b,
+    'andnot': lambda a, b: a & ~b,
+    'xor': lambda a, b: a ^ b,
+}
+
+
+class Bitmap:
+    """
+    Set of integers 0 ≤ x < 2³² in roaring-style containers: containers maps
+    the high 16 bits to a sorted uint16 array or a bitmap of 1024 uint64 words.
+    """
+
+    def __init__(self, containers=None):
+        self.containers = dict(sorted((containers or {}).items()))
+
+    @classmethod
+    def from_ids(cls, ids):
+        """
+        Bitmap of an iterable or array of ids (duplicates allowed).
+        """
+        ids = np.asarray(ids if isinstance(ids, np.ndarray) else list(ids), dtype=np.int64)
+        if ids.size and (ids.min() < 0 or ids.max() >= 1 << 32):
+            raise ValueError("ids must be in the range 0 ≤ id < 2**32")
+        ids = np.unique(ids)
+        high = ids >> 16
+        keys, starts = np.unique(high, return_index=True)
+        bounds = np.append(starts, ids.size)
+        containers = {}
+        for key, start, stop in zip(keys.tolist(), bounds[:-1].tolist(), bounds[1:].tolist()):
+            low = (ids[start:stop] & 0xFFFF).astype(np.uint16)
+            containers[key] = low if low.size <= ARRAY_LIMIT else _dense(low)
+        return cls(containers)
+
+    @classmethod
+    def from_range(cls, start, stop):
+        """
+        Bitmap of range(start, stop), e.g. the universe of all record ids.
+        """
+        containers = {}
+        for key in range(start >> 16, ((stop - 1) >> 16) + 1 if stop > start else start >> 16):
+            first = max(start, key << 16) & 0xFFFF
+            last = min(stop, (key + 1) << 16) - (key << 16)
+            if first == 0 and last == 1 << 16:
+                containers[key] = np.full(_WORDS, 0xFFFFFFFFFFFFFFFF, dtype=np.uint64)
+            else:
+                low = np.arange(first, last, dtype=np.uint16)
+                containers[key] = low if low.size <= ARRAY_LIMIT else _dense(low)
+        return cls(containers)
+
+    def __len__(self):
+        return sum(_cardinality(c) for c in self.containers.values())
+
+    def __contains__(self, x):
+        container = self.containers.get(x >> 16)
+        if container is None:
+            return False
+        low = x & 0xFFFF
+        if container.dtype == np.uint16:
+            i = np.searchsorted(container, low)
+            return bool(i < container.size and container[i] == low)
+        return bool(container[low >> 6] >> np.uint64(low & 63) & np.uint64(1))
+
+    def __iter__(self):
+        return iter(self.to_array().tolist())
+
+    def __eq__(self, other):
+        return isinstance(other, Bitmap) and self.containers.keys() == other.containers.keys() and all(
+            np.array_equal(_dense(c), _dense(other.containers[key])) for key, c in self.containers.items())
+
+    def __repr__(self):
+        return f"Bitmap({len(self)} Elemente, {len(self.containers)} Container, {self.nbytes} Bytes)"
+
+    @property
+    def nbytes(self):
+        return sum(c.nbytes for c in self.containers.values())
+
+    def to_array(self):
+        """
+        All elements as sorted uint32 array.
+        """
+        parts = []
+        for key, container in self.containers.items():
+            if container.dtype == np.uint64:
+                container = np.flatnonzero(np.unpackbits(container.view(np.uint8), bitorder='little'))
+            parts.append((np.uint32(key) << np.uint32(16)) | container.astype(np.uint32))
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.uint32)
+
+    def _binary(self, other, op):
+        if op == 'and':
+            keys = self.containers.keys() & other.containers.keys()
+        elif op == 'andnot':
+            keys = self.containers.keys()
+        else:
+            keys = self.containers.keys() | other.containers.keys()
+        empty = np.zeros(0, dtype=np.uint16)
+        containers, dense = {}, []
+        for key in sorted(keys):
+            a, b = self.containers.get(key, empty), other.containers.get(key, empty)
+            if a.dtype == np.uint16 and b.dtype == np.uint16:
+                result = _ARRAY_OPS[op](a, b).astype(np.uint16)
+            elif a.dtype == np.uint16 and op in ('and', 'andnot'):
+                # Array gegen Bitmap: nur die Bits der Array-Elemente nachschlagen
+                found = _probe(a, b)
+                result = a[found if op == 'and' else ~found]
+            elif b.dtype == np.uint16 and op == 'and':
+                result = b[_probe(b, a)]
+            else:
+                dense.append(key)
+                continue
+            if result.size:
+                containers[key] = result if result.size <= ARRAY_LIMIT else _dense(result)
+        # Bitmap-Container blockweise vektorisiert verknüpfen
+        for first in range(0, len(dense), BLOCK_KEYS):
+            block = dense[first:first + BLOCK_KEYS]
+            _compress_block(block, _WORD_OPS[op](_dense_block(self, block), _dense_block(other, block)), containers)
+        return Bitmap(containers)
+
+    def __and__(self, other):
+        return self._binary(other, 'and')
+
+    def __or__(self, other):
+        return self._binary(other, 'or')
+
+    def __sub__(self, other):
+        return self._binary(other, 'andnot')
+
+    def __xor__(self, other):
+        return self._binary(other, 'xor')
+
+
+def _dense_block(bitmap, keys):
+    """
+    Containers of bitmap for the given keys as (len(keys), 1024) uint64 matrix.
+    """
+    words = np.zeros((len(keys), _WORDS), dtype=np.uint64)
+    rows, lows = [], []
+    for i, key in enumerate(keys):
+        container = bitmap.containers.get(key)
+        if container is None:
+            continue
+        if container.dtype == np.uint64:
+            words[i] = container
+        else:
+            rows.append(np.full(container.size, i))
+            lows.append(container)
+    if rows:
+        # alle Array-Container des Blocks auf einmal in Bits umsetzen
+        bits = np.zeros((len(keys), 1 << 16), dtype=bool)
+        bits[np.concatenate(rows), np.concatenate(lows)] = True
+        words |= np.packbits(bits, axis=1, bitorder='little').view('<u8')
+    return words
+
+
+def _compress_block(keys, words, containers):
+    """
+    Stores the non-empty rows of a (len(keys), 1024) word matrix in containers.
+    """
+    counts = np.bitwise_count(words).sum(axis=1)
+    for key, row, count in zip(keys, words, counts.tolist()):
+        if count > ARRAY_LIMIT:
+            containers[key] = row.copy()
+    sparse = np.flatnonzero((counts > 0) & (counts <= ARRAY_LIMIT))
+    if sparse.size:
+        # Bits der Wörter ungleich 0 einzeln abtrennen (niedrigstes gesetztes Bit zuerst),
+        # der Aufwand wächst so mit der Anzahl der Elemente statt mit 2¹⁶ Bits je Zeile
+        block = words[sparse]
+        rows, columns = np.nonzero(block)
+        values = block[rows, columns]
+        positions = columns * 64
+        found_rows, found = [], []
+        while values.size:
+            low = values & (~values + np.uint64(1))
+            found_rows.append(rows)
+            found.append(positions + np.log2(low).astype(np.int64))
+            values = values ^ low
+            keep = values != 0
+            values, rows, positions = values[keep], rows[keep], positions[keep]
+        found_rows, found = np.concatenate(found_rows), np.concatenate(found)
+        order = np.argsort(found_rows * (1 << 16) + found, kind='stable')
+        lows = found[order].astype(np.uint16)
+        for i, low in zip(sparse.tolist(), np.split(lows, np.cumsum(counts[sparse])[:-1])):
+            containers[keys[i]] = low
+
+
+def evaluate(expr, sets, universe, block_keys=BLOCK_KEYS):
+    """
+    Set described by the propositional formula expr, where every variable
+    stands for a Bitmap in sets ({Symbol or name: Bitmap}) and ¬ means the
+    complement in universe. The whole formula is evaluated block by block of
+    containers, without building intermediate sets.
+    """
+    sets = {Symbol(k) if isinstance(k, str) else k: v for k, v in sets.items()}
+    compiled = compile_formula(expr, sorted(expr.free_symbols, key=lambda s: s.name))
+    leaves = [sets[v] for v in compiled.variables]
+    # Container, in denen keine Variable vorkommt: Ergebnis hängt nur vom Wert der Formel für "alles falsch" ab
+    empty_value = _run(compiled, [np.zeros(1, dtype=np.uint64)] * len(leaves))[0]
+    if empty_value:
+        keys = sorted(universe.containers)
+    else:
+        keys = sorted(set().union(*(leaf.containers for leaf in leaves)) & universe.containers.keys())
+    containers = {}
+    for first in range(0, len(keys), block_keys):
+        block = keys[first:first + block_keys]
+        result = _run(compiled, [_dense_block(leaf, block) for leaf in leaves])
+        _compress_block(block, result & _dense_block(universe, block), containers)
+    return Bitmap(containers)
+
+
+def _run(compiled, columns):
+    """
+    Executes the program of a compiled formula on the given variable columns.
+    """
+    values = [None] * len(compiled.program)
+    for i, (op, args) in enumerate(compiled.program):
+        if op == 'variable':
+            values[i] = columns[args[0]]
+            continue
+        values[i] = apply_instruction(op, [values[arg] for arg in args], columns[0].shape if columns else (1,))
+        for arg in args:
+            if compiled.last_use[arg] == i and arg != compiled.result:
+                values[arg] = None
+    return values[compiled.result].copy()
+
+
+def set_formula(A, B, X):
+    """
+    (A ∩ B) ∪ (X \\ A) like in logic2sets.py, evaluated in one pass.
+    """
+    a, b = symbols('A B')
+    return evaluate(Or(And(a, b), Not(a)), {a: A, b: B}, X)
+
+
+def benchmark(size=30_000_000, sample=1_000_000, seed=0):
+    """
+    Evaluates (A ∩ B) ∪ (X \\ A) over a universe of size record ids with
+    Python sets (on a sample only, because of the memory), boolean NumPy
+    arrays, operation-by-operation bitmap operations and the one-pass evaluation.
+    """
+    rng = np.random.default_rng(seed)
+    # Grundmenge: fortlaufende Nummern, einige Datensätze gelöscht
+    ids = np.flatnonzero(rng.random(size) < 0.97)
+    available = ids[rng.random(ids.size) < 0.6]
+    german = ids[rng.random(ids.size) < 0.3]
+    print(f"Benchmark: (A ∩ B) ∪ (X \\ A) mit |X| = {ids.size}, |A| = {available.size}, |B| = {german.size}")
+
+    X, A, B = Bitmap.from_ids(ids), Bitmap.from_ids(available), Bitmap.from_ids(german)
+    start = perf_counter()
+    result = set_formula(A, B, X)
+    lazy_time = perf_counter() - start
+    start = perf_counter()
+    stepwise = (A & B) | (X - A)
+    stepwise_time = perf_counter() - start
+    assert result == stepwise
+    x, a, b = (np.zeros(size, dtype=bool) for _ in range(3))
+    x[ids], a[available], b[german] = True, True, True
+    start = perf_counter()
+    numpy_result = (a & b) | (x & ~a)
+    numpy_time = perf_counter() - start
+    assert np.array_equal(result.to_array(), np.flatnonzero(numpy_result))
+    print(f"  Ergebnis: {len(result)} Elemente, Speicher Bitmaps {(X.nbytes + A.nbytes + B.nbytes) / 2**20:.1f} MB")
+    print(f"  ein Durchlauf {lazy_time:.3f} s, schrittweise {stepwise_time:.3f} s, "
+          f"NumPy-Bool-Arrays {numpy_time:.3f} s ({3 * size / 2**20:.1f} MB)")
+
+    limit = np.searchsorted(ids, sample)
+    x, a, b = set(ids[:limit].tolist()), set(available[available < sample].tolist()), set(german[german < sample].tolist())
+    start = perf_counter()
+    python_result = (a & b) | (x - a)
+    python_time = perf_counter() - start
+    X, A, B = Bitmap.from_ids(ids[:limit]), Bitmap.from_ids(available[available < sample]), \
+        Bitmap.from_ids(german[german < sample])
+    start = perf_counter()
+    result = set_formula(A, B, X)
+    lazy_time = perf_counter() - start
+    assert set(result) == python_result
+    print(f"  |X| = {len(x)}: Python-Mengen {python_time:.3f} s, ein Durchlauf {lazy_time:.3f} s")
+
+    # seltene Facette (Array-Container) in einer längeren Formel
+    c, d = symbols('C D')
+    rare = Bitmap.from_ids(ids[rng.random(ids.size) < 0.001])
+    expr = And(Or(c, Not(symbols('A'))), Not(d))
+    sets = {'A': Bitmap.from_ids(available), 'C': rare, 'D': Bitmap.from_ids(german)}
+    X = Bitmap.from_ids(ids)
+    start = perf_counter()
+    result = evaluate(expr, sets, X)
+    lazy_time = perf_counter() - start
+    start = perf_counter()
+    stepwise = ((sets['C'] | (X - sets['A'])) & X) - sets['D']
+    stepwise_time = perf_counter() - start
+    assert result == stepwise
+    print(f"  {expr}: ein Durchlauf {lazy_time:.3f} s, schrittweise {stepwise_time:.3f} s")
+
+
+if __name__ == '__main__':
+    # Beispiel aus logic2sets.py
+    X = Bitmap.from_ids({1, 2, 3, 4, 5})
+    A = Bitmap.from_ids({1, 2})
+    B = Bitmap.from_ids({2, 3, 5})
+    print("(A ∩ B) ∪ (X \\ A) =", set(set_formula(A, B, X)))
+    print()
+    benchmark()
@@ -0,0 +1,450 @@
+"""
+Äquivalenz- und Erfüllbarkeitsprüfung mit einem SAT-Solver
+
+simplify_logic_formula.py zeigt die Gleichwertigkeit von Originalaussage und
+vereinfachter Aussage, indem beide Wahrheitstabellen vollständig ausgegeben
+werden; bei n Variablen sind das 2ⁿ Zeilen für eine Ja/Nein-Frage. Hier wird
+stattdessen gefragt, ob es eine Belegung gibt, für die sich die Aussagen
+unterscheiden (expr1 XOR expr2 erfüllbar). Dazu wird die Formel mit der
+Tseitin-Transformation in eine gleicherfüllbare konjunktive Normalform
+übersetzt (eine Hilfsvariable je Teilformel, wenige Klauseln je Hilfsvariable) und mit
+einem kleinen CDCL-Solver gelöst (Conflict-Driven Clause Learning mit zwei
+beobachteten Literalen je Klausel, Lernen am ersten eindeutigen
+Implikationspunkt, VSIDS-Variablenwahl und Neustarts nach der Luby-Folge).
+Ist die Formel erfüllbar, liefert der Solver ein Gegenbeispiel.
+"""
+
+import heapq
+from time import perf_counter
+
+from sympy import symbols
+from sympy.logic.boolalg import (And, BooleanFalse, BooleanTrue, Equivalent, Implies, ITE, Nand, Nor, Not,
+                                 Or, Xnor, Xor)
+from sympy.logic.inference import satisfiable as sympy_satisfiable
+
+from truth_tables import compile_formula, random_formula
+
+
+class Solver:
+    """
+    CDCL SAT solver. Clauses are given as lists of non-zero ints like in the
+    DIMACS format: v stands for variable v, -v for its negation.
+    """
+
+    def __init__(self):
+        self.num_vars = 0
+        self.value = [0, 0]  # je Literal: 1 wahr, -1 falsch, 0 offen (Literal 2v bzw. 2v + 1)
+        self.level = [0]
+        self.reason = [None]
+        self.activity = [0.0]
+        self.phase = [1]
+        self.watches = [[], []]
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.heap = []
+        self.increment = 1.0
+        self.ok = True
+        self.conflicts = 0
+
+    def _new_var(self):
+        self.num_vars += 1
+        v = self.num_vars
+        self.value += [0, 0]
+        self.level.append(0)
+        self.reason.append(None)
+        self.activity.append(0.0)
+        self.phase.append(1)
+        self.watches += [[], []]
+        heapq.heappush(self.heap, (0.0, v))
+        return v
+
+    @staticmethod
+    def _literal(lit):
+        return 2 * lit if lit > 0 else -2 * lit + 1
+
+    def add_clause(self, clause):
+        """
+        Adds a clause (at decision level 0); returns False if the formula is unsatisfiable.
+        """
+        for lit in clause:
+            while abs(lit) > self.num_vars:
+                self._new_var()
+        literals = []
+        for lit in set(map(self._literal, clause)):
+            if lit ^ 1 in literals or self.value[lit] == 1:
+                return True  # immer erfüllt
+            if self.value[lit] == 0 and lit ^ 1 not in literals:
+                literals.append(lit)
+        if not literals:
+            self.ok = False
+        elif len(literals) == 1:
+            self._assign(literals[0], None)
+            self.ok = self._propagate() is None
+        else:
+            self.watches[literals[0]].append(literals)
+            self.watches[literals[1]].append(literals)
+        return self.ok
+
+    def _assign(self, lit, reason):
+        self.value[lit] = 1
+        self.value[lit ^ 1] = -1
+        v = lit >> 1
+        self.level[v] = len(self.trail_lim)
+        self.reason[v] = reason
+        self.trail.append(lit)
+
+    def _propagate(self):
+        """
+        Unit propagation with two watched literals; returns a conflicting clause or None.
+        """
+        value, watches, trail = self.value, self.watches, self.trail
+        while self.qhead < len(trail):
+            false_lit = trail[self.qhead] ^ 1
+            self.qhead += 1
+            watching = watches[false_lit]
+            i = j = 0
+            n = len(watching)
+            while i < n:
+                clause = watching[i]
+                i += 1
+                # beobachtete Literale stehen an Position 0 und 1
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                if value[first] == 1:
+                    watching[j] = clause
+                    j += 1
+                    continue
+                for k in range(2, len(clause)):
+                    if value[clause[k]] != -1:
+                        clause[1], clause[k] = clause[k], false_lit
+                        watches[clause[1]].append(clause)
+                        break
+                else:
+                    watching[j] = clause
+                    j += 1
+                    if value[first] == -1:
+                        while i < n:
+                            watching[j] = watching[i]
+                            j += 1
+                            i += 1
+                        del watching[j:]
+                        return clause
+                    self._assign(first, clause)
+            del watching[j:]
+        return None
+
+    def _bump(self, v):
+        self.activity[v] += self.increment
+        if self.activity[v] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+            self.heap = [(-self.activity[u], u) for u in range(1, self.num_vars + 1) if self.value[2 * u] == 0]
+            heapq.heapify(self.heap)
+        elif self.value[2 * v] == 0:
+            heapq.heappush(self.heap, (-self.activity[v], v))
+
+    def _analyze(self, conflict):
+        """
+        Learnt clause at the first unique implication point and the backjump level.
+        """
+        seen = set()
+        learnt = [None]
+        current = len(self.trail_lim)
+        counter = 0
+        index = len(self.trail) - 1
+        clause, lit = conflict, None
+        while True:
+            for q in (clause if lit is None else clause[1:]):
+                v = q >> 1
+                if v not in seen and self.level[v] > 0:
+                    seen.add(v)
+                    self._bump(v)
+                    if self.level[v] >= current:
+                        counter += 1
+                    else:
+                        learnt.append(q)
+            # nächstes markiertes Literal auf dem Trail (rückwärts)
+            while self.trail[index] >> 1 not in seen:
+                index -= 1
+            lit = self.trail[index]
+            index -= 1
+            clause = self.reason[lit >> 1]
+            counter -= 1
+            if counter == 0:
+                break
+        learnt[0] = lit ^ 1
+        self.increment /= 0.95
+        if len(learnt) == 1:
+            return learnt, 0
+        # Literal mit der höchsten Entscheidungsebene an Position 1 (zweites beobachtetes Literal)
+        k = max(range(1, len(learnt)), key=lambda i: self.level[learnt[i] >> 1])
+        learnt[1], learnt[k] = learnt[k], learnt[1]
+        return learnt, self.level[learnt[1] >> 1]
+
+    def _backtrack(self, level):
+        if len(self.trail_lim) <= level:
+            return
+        for lit in self.trail[self.trail_lim[level]:]:
+            v = lit >> 1
+            self.phase[v] = 1 if lit & 1 == 0 else -1
+            self.value[lit] = self.value[lit ^ 1] = 0
+            self.reason[v] = None
+            heapq.heappush(self.heap, (-self.activity[v], v))
+        del self.trail[self.trail_lim[level]:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    def _decide(self):
+        while self.heap:
+            _, v = heapq.heappop(self.heap)
+            if self.value[2 * v] == 0:
+                return 2 * v if self.phase[v] == 1 else 2 * v + 1
+        return None
+
+    def solve(self):
+        """
+        True if the clauses are satisfiable (model() then returns an assignment), else False.
+        """
+        if not self.ok:
+            return False
+        if self._propagate() is not None:
+            self.ok = False
+            return False
+        restart = 1
+        budget = 64 * _luby(restart)
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                budget -= 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learnt, level = self._analyze(conflict)
+                self._backtrack(level)
+                if len(learnt) == 1:
+                    self._assign(learnt[0], None)
+                else:
+                    self.watches[learnt[0]].append(learnt)
+                    self.watches[learnt[1]].append(learnt)
+                    self._assign(learnt[0], learnt)
+            elif budget <= 0:
+                restart += 1
+                budget = 64 * _luby(restart)
+                self._backtrack(0)
+            else:
+                lit = self._decide()
+                if lit is None:
+                    return True
+                self.trail_lim.append(len(self.trail))
+                self._assign(lit, None)
+
+    def model(self):
+        """
+        Assignment of the last successful solve() as dict {variable: bool}.
+        """
+        return {v: self.value[2 * v] == 1 for v in range(1, self.num_vars + 1)}
+
+
+def _luby(i):
+    """
+    i-th element (from 1) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, ...
+    """
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while (1 << k) - 1 != i:
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+    return 1 << (k - 1)
+
+
+class Tseitin:
+    """
+    Tseitin encoding of sympy Boolean expressions into clauses; every
+    subexpression gets one auxiliary variable, shared subexpressions are
+    encoded only once.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.variables = {}  # Symbol -> Variablennummer
+        self.num_vars = 0
+        self._cache = {}
+
+    def _new_var(self):
+        self.num_vars += 1
+        return self.num_vars
+
+    def literal(self, expr):
+        """
+        Literal that is equivalent to expr under the added clauses.
+        """
+        if expr in self._cache:
+            return self._cache[expr]
+        if isinstance(expr, Not):
+            lit = -self.literal(expr.args[0])
+        elif isinstance(expr, (BooleanTrue, BooleanFalse)):
+            lit = self._new_var()
+            self.clauses.append([lit if isinstance(expr, BooleanTrue) else -lit])
+        elif expr.is_Symbol:
+            lit = self.variables[expr] = self._new_var()
+        elif isinstance(expr, (Nand, Nor, Xnor)):
+            inner = {Nand: And, Nor: Or, Xnor: Xor}[type(expr)]
+            lit = -self._gate(inner, [self.literal(arg) for arg in expr.args])
+        elif isinstance(expr, Implies):
+            lit = self._gate(Or, [-self.literal(expr.args[0]), self.literal(expr.args[1])])
+        elif isinstance(expr, Equivalent):
+            args = [self.literal(arg) for arg in expr.args]
+            lit = self._gate(Or, [self._gate(And, args), self._gate(And, [-a for a in args])])
+        elif isinstance(expr, ITE):
+            c, a, b = (self.literal(arg) for arg in expr.args)
+            lit = self._new_var()
+            self.clauses += [[-lit, -c, a], [-lit, c, b], [lit, -c, -a], [lit, c, -b]]
+        elif isinstance(expr, (And, Or, Xor)):
+            lit = self._gate(type(expr), [self.literal(arg) for arg in expr.args])
+        else:
+            raise TypeError(f"unsupported Boolean function: {type(expr).__name__}")
+        self._cache[expr] = lit
+        return lit
+
+    def _gate(self, kind, args):
+        if kind is Xor:
+            # Kette zweistelliger XOR-Gatter
+            lit = args[0]
+            for b in args[1:]:
+                a, lit = lit, self._new_var()
+                self.clauses += [[-lit, a, b], [-lit, -a, -b], [lit, -a, b], [lit, a, -b]]
+            return lit
+        lit = self._new_var()
+        if kind is And:
+            self.clauses += [[-lit, a] for a in args]
+            self.clauses.append([lit] + [-a for a in args])
+        else:
+            self.clauses += [[lit, -a] for a in args]
+            self.clauses.append([-lit] + list(args))
+        return lit
+
+
+def satisfiable(expr):
+    """
+    A satisfying assignment {Symbol: bool} of expr, or False (like sympy's satisfiable).
+    """
+    encoder = Tseitin()
+    root = encoder.literal(expr)
+    solver = Solver()
+    for clause in encoder.clauses + [[root]]:
+        if not solver.add_clause(clause):
+            return False
+    if not solver.solve():
+        return False
+    model = solver.model()
+    return {symbol: model.get(v, False) for symbol, v in encoder.variables.items()}
+
+
+def equivalent(expr1, expr2):
+    """
+    (True, None) if expr1 ≡ expr2, otherwise (False, counterexample) with an
+    assignment {Symbol: bool} for which the two expressions differ.
+    """
+    counterexample = satisfiable(Xor(expr1, expr2))
+    if counterexample is False:
+        return True, None
+    for symbol in (expr1.free_symbols | expr2.free_symbols) - set(counterexample):
+        counterexample[symbol] = False
+    return False, counterexample
+
+
+def ripple_carry_adder(a, b):
+    """
+    Output bits of a + b (bits least significant first) with ripple carry.
+    """
+    outputs, carry = [], None
+    for x, y in zip(a, b):
+        if carry is None:
+            outputs.append(Xor(x, y))
+            carry = And(x, y)
+        else:
+            outputs.append(Xor(Xor(x, y), carry))
+            carry = Or(And(x, y), And(carry, Xor(x, y)))
+    return outputs + [carry]
+
+
+def propagate_adder(a, b, buggy=False):
+    """
+    The same adder written differently: carry g ∨ (p ∧ c) with generate
+    g = x ∧ y and propagate p = x ∨ y, output bit ITE(c, x ↔ y, x ⊕ y). With
+    buggy=True the carry of the middle bit ignores y.
+    """
+    outputs, carry = [], None
+    for i, (x, y) in enumerate(zip(a, b)):
+        if carry is None:
+            outputs.append(And(Or(x, y), Not(And(x, y))))
+            carry = And(x, y)
+            continue
+        outputs.append(ITE(carry, Xnor(x, y), Xor(x, y)))
+        propagate = x if buggy and i == len(a) // 2 else Or(x, y)
+        carry = Or(And(x, y), And(propagate, carry))
+    return outputs + [carry]
+
+
+def benchmark(bits=(8, 12, 14, 16, 32), table_limit=28, sizes=(30, 60, 90, 120)):
+    """
+    Equivalence check of a ripple-carry adder and a generate/propagate adder
+    with 2 · bits inputs (and of a buggy variant, for which a counterexample is
+    found) against the full truth-table comparison of truth_tables.py up to
+    table_limit variables; then random 3-CNF formulas near the satisfiability
+    threshold against sympy's satisfiable.
+    """
+    print("Benchmark: Äquivalenz zweier Addierwerke (Miter-Schaltung)")
+    for n in bits:
+        a, b = symbols(f'a0:{n}'), symbols(f'b0:{n}')
+        reference = ripple_carry_adder(a, b)
+        for buggy in (False, True):
+            other = propagate_adder(a, b, buggy)
+            miter = Or(*(Xor(x, y) for x, y in zip(reference, other)))
+            start = perf_counter()
+            counterexample = satisfiable(miter)
+            own_time = perf_counter() - start
+            assert (counterexample is False) == (not buggy)
+            if counterexample:
+                assert miter.subs(counterexample) == True  # noqa: E712 (sympy-Wahrheitswert)
+            line = (f"  {2 * n:2d} Variablen, {'fehlerhaft' if buggy else 'korrekt   '}: "
+                    f"{'Gegenbeispiel' if counterexample else 'äquivalent'} nach {own_time:6.3f} s")
+            if 2 * n <= table_limit:
+                start = perf_counter()
+                assert compile_formula(miter, list(a) + list(b)).packed().any() == buggy
+                line += f", Wahrheitstabelle mit {2 ** (2 * n)} Zeilen {perf_counter() - start:6.3f} s"
+            print(line)
+
+    print("Benchmark: zufällige 3-KNF-Formeln mit 4,26 Klauseln je Variable")
+    for n in sizes:
+        expr, _ = random_formula(n, num_clauses=int(4.26 * n), seed=n)
+        start = perf_counter()
+        model = satisfiable(expr)
+        own_time = perf_counter() - start
+        start = perf_counter()
+        reference = sympy_satisfiable(expr)
+        sympy_time = perf_counter() - start
+        assert (model is False) == (reference is False)
+        if model:
+            assert expr.subs(model) == True  # noqa: E712
+        print(f"  {n:3d} Variablen ({'erfüllbar' if model else 'unerfüllbar'}): "
+              f"CDCL {own_time:6.3f} s, sympy.satisfiable {sympy_time:6.3f} s")
+
+
+if __name__ == '__main__':
+    from logic_minimizer import minimize
+
+    A, B, C = symbols('A B C')
+    # Aussage 1: (¬A ∧ ¬B ∧ ¬C) ∨ (¬A ∧ ¬B ∧ C) ∨ (A ∧ B ∧ ¬C)
+    expr = Or(And(Not(A), Not(B), Not(C)), And(Not(A), Not(B), C), And(A, B, Not(C)))
+    simplified = minimize(expr, [A, B, C])
+    print(f"{expr} ≡ {simplified}: {equivalent(expr, simplified)}")
+    print(f"{expr} ≡ {Or(Not(A), B)}: {equivalent(expr, Or(Not(A), B))}")
+    print()
+    benchmark()
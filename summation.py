@@ -0,0 +1,194 @@
+"""
+Summenformeln statt Schleifen
+
+Die Skripte sum.py, sum-squares.py, sum-even-numbers.py, sum-odd-numbers.py
+und sum-powers-of-2.py addieren die Glieder einzeln in einer Schleife von 1
+bis n. Dieselben Summen lassen sich mit geschlossenen Formeln in konstanter
+Zeit berechnen:
+- 1 + 2 + ... + n = n(n+1)/2 (Gaußsche Summenformel)
+- 1² + 2² + ... + n² = n(n+1)(2n+1)/6
+- 2 + 4 + ... + 2n = n(n+1) und 1 + 3 + ... + (2n-1) = n²
+- 2⁰ + 2¹ + ... + 2ⁿ = 2ⁿ⁺¹ - 1
+- allgemein 1ᵖ + 2ᵖ + ... + nᵖ mit der Formel von Faulhaber, einem Polynom
+  vom Grad p + 1, dessen Koeffizienten aus den Bernoulli-Zahlen folgen
+Alle Funktionen nehmen auch NumPy-Arrays von n entgegen und rechnen dann
+vektorisiert (exakt mit int64, bei drohendem Überlauf mit Python-Zahlen).
+"""
+
+import math
+from fractions import Fraction
+from functools import lru_cache
+from time import perf_counter
+
+import numpy as np
+
+_INT64_MAX = 2**63 - 1
+
+
+@lru_cache(maxsize=None)
+def bernoulli(m):
+    """
+    Bernoulli number B_m as Fraction (with B_1 = +1/2, as needed for sums up to n).
+    """
+    if m == 0:
+        return Fraction(1)
+    # Rekursion Σ_{j=0}^{m} C(m+1, j) B_j = m + 1 (Konvention B_1 = +1/2)
+    return (m + 1 - sum(math.comb(m + 1, j) * bernoulli(j) for j in range(m))) / (m + 1)
+
+
+@lru_cache(maxsize=None)
+def faulhaber(p):
+    """
+    Faulhaber's polynomial for 1ᵖ + ... + nᵖ as (coefficients, denominator):
+    integer coefficients c_0..c_{p+1} with sum = (Σ c_k nᵏ) / denominator.
+    """
+    fractions = [Fraction(0)] * (p + 2)
+    for j in range(p + 1):
+        fractions[p + 1 - j] = Fraction(math.comb(p + 1, j)) * bernoulli(j) / (p + 1)
+    denominator = math.lcm(*(f.denominator for f in fractions))
+    return tuple(int(f * denominator) for f in fractions), denominator
+
+
+def _fits_int64(n_max, coefficients):
+    """
+    Whether Horner's scheme stays in int64 for all 0 ≤ n ≤ n_max.
+    """
+    return sum(abs(c) for c in coefficients) * max(n_max, 1) ** (len(coefficients) - 1) <= _INT64_MAX
+
+
+def _as_array(n):
+    n = np.asarray(n)
+    if n.dtype.kind not in 'iuO':
+        raise TypeError("n must be an integer or an array of integers")
+    if n.size and n.min() < 0:
+        raise ValueError("n must not be negative")
+    return n
+
+
+def power_sum(n, p):
+    """
+    1ᵖ + 2ᵖ + ... + nᵖ with Faulhaber's formula; n may be an int or an array.
+    """
+    if p < 0:
+        raise ValueError("p must not be negative")
+    coefficients, denominator = faulhaber(p)
+    if isinstance(n, (int, np.integer)):
+        if n < 0:
+            raise ValueError("n must not be negative")
+        n = int(n)
+        value = 0
+        for c in reversed(coefficients):
+            value = value * n + c
+        return value // denominator
+    n = _as_array(n)
+    if n.dtype != object and _fits_int64(int(n.max()) if n.size else 0, coefficients):
+        n = n.astype(np.int64)
+    else:
+        n = n.astype(object)
+    # Horner-Schema, elementweise für alle n auf einmal
+    value = np.zeros(n.shape, dtype=n.dtype)
+    for c in reversed(coefficients):
+        value = value * n + c
+    return value // denominator
+
+
+def sum_naturals(n):
+    """
+    1 + 2 + ... + n = n(n+1)/2.
+    """
+    return power_sum(n, 1)
+
+
+def sum_squares(n):
+    """
+    1² + 2² + ... + n² = n(n+1)(2n+1)/6.
+    """
+    return power_sum(n, 2)
+
+
+def sum_even(n):
+    """
+    Sum of the first n even numbers 2 + 4 + ... + 2n = n(n+1).
+    """
+    return 2 * power_sum(n, 1)
+
+
+def sum_odd(n):
+    """
+    Sum of the first n odd numbers 1 + 3 + ... + (2n-1) = n².
+    """
+    if isinstance(n, (int, np.integer)):
+        return int(n) * int(n)
+    n = _as_array(n)
+    if n.dtype == object or (n.size and int(n.max()) ** 2 > _INT64_MAX):
+        return n.astype(object) ** 2
+    return n.astype(np.int64) ** 2
+
+
+def sum_powers_of_2(n):
+    """
+    2⁰ + 2¹ + ... + 2ⁿ = 2ⁿ⁺¹ - 1.
+    """
+    if isinstance(n, (int, np.integer)):
+        return (1 << (int(n) + 1)) - 1
+    n = _as_array(n)
+    if n.dtype == object or (n.size and int(n.max()) > 61):
+        return np.array([(1 << (int(k) + 1)) - 1 for k in n.ravel()], dtype=object).reshape(n.shape)
+    return (np.int64(1) << (n.astype(np.int64) + 1)) - 1
+
+
+# Schleifen wie in den Skripten, nur als Referenz für den Vergleich
+_LOOPS = {
+    'sum_naturals': lambda n: sum(i for i in range(1, n + 1)),
+    'sum_squares': lambda n: sum(i * i for i in range(1, n + 1)),
+    'sum_even': lambda n: sum(2 * i for i in range(1, n + 1)),
+    'sum_odd': lambda n: sum(2 * i - 1 for i in range(1, n + 1)),
+    'sum_powers_of_2': lambda n: sum(2 ** i for i in range(0, n + 1)),
+}
+
+
+def benchmark(n=10**6, count=10**6):
+    """
+    Compares the closed forms with the loops of the sum-*.py scripts (which
+    also serve as cross-check), and the vectorized evaluation for an array of
+    count values of n with a Python loop over the closed form.
+    """
+    print(f"Benchmark: Summe bis n = {n}, Formel gegen Schleife")
+    for name, loop in _LOOPS.items():
+        function = globals()[name]
+        m = n if name != 'sum_powers_of_2' else n // 100
+        start = perf_counter()
+        value = function(m)
+        formula_time = perf_counter() - start
+        start = perf_counter()
+        reference = loop(m)
+        loop_time = perf_counter() - start
+        assert value == reference
+        print(f"  {name:16s} (n = {m:7d}): Formel {formula_time * 1e6:8.1f} µs, Schleife {loop_time * 1000:8.1f} ms")
+    for p in (3, 7, 10):
+        assert power_sum(1000, p) == sum(i ** p for i in range(1, 1001))
+
+    ns = np.random.default_rng(0).integers(0, 10**5, count)
+    print(f"Benchmark: Quadratsummen für {count} Werte von n")
+    start = perf_counter()
+    values = sum_squares(ns)
+    vectorized_time = perf_counter() - start
+    start = perf_counter()
+    reference = [sum_squares(k) for k in ns.tolist()]
+    scalar_time = perf_counter() - start
+    assert values.tolist() == reference
+    print(f"  vektorisiert {vectorized_time:.3f} s, Formel in Schleife {scalar_time:.3f} s")
+
+
+if __name__ == '__main__':
+    print(f"Sum of numbers from 1 to 5 is: {sum_naturals(5)}")
+    print(f"Sum of squares of first 6 natural numbers is: {sum_squares(6)}")
+    print(f"Sum of first 100 even numbers is: {sum_even(100)}")
+    print(f"Sum of first 10 odd numbers is: {sum_odd(10)}")
+    print(f"Sum of first 10 powers of 2 is: {sum_powers_of_2(9)}")
+    coefficients, denominator = faulhaber(3)
+    print(f"1³ + ... + n³ = ({' + '.join(f'{c}·n^{k}' for k, c in enumerate(coefficients) if c)}) / {denominator}")
+    print(sum_squares(np.arange(10)))
+    print(power_sum(np.array([10, 10**6]), 5))
+    print()
+    benchmark()
@@ -0,0 +1,258 @@
+"""
+Wahrheitstabellen für Formeln mit vielen Variablen als Bitvektoren
+
+truth_table aus sympy (vgl. truth-table.py) setzt für jede der 2ⁿ Zeilen
+einzeln Wahrheitswerte in die Formel ein; ab etwa 15 Variablen dauert das
+Minuten. Hier wird die Formel einmal in eine Folge bitweiser Operationen
+(&, |, ^, ~) übersetzt. Jede Variable ist eine Spalte aus 2ⁿ Bits, je 64
+Zeilen in einer 64-Bit-Zahl eines NumPy-Arrays; eine Operation wertet so 64
+Zeilen auf einmal aus. Die Zeilen haben dieselbe Reihenfolge wie bei sympy
+(die erste Variable ist das höchstwertige Bit der Zeilennummer) und werden
+blockweise erzeugt, so dass auch sehr lange Tabellen mit wenig Speicher
+ausgegeben werden können.
+"""
+
+from time import perf_counter
+
+import numpy as np
+from sympy import Symbol, symbols
+from sympy.logic.boolalg import (And, BooleanFalse, BooleanTrue, Equivalent, Implies, ITE, Nand, Nor, Not,
+                                 Or, Xnor, Xor, truth_table)
+
+_ALL = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# Bitmuster der Variablen, die sich innerhalb einer 64-Bit-Zahl ändern (Zeilenbit k < 6)
+_PATTERNS = [np.uint64(sum(1 << b for b in range(64) if b >> k & 1)) for k in range(6)]
+
+
+def _instruction(expr):
+    """
+    Operation name of a sympy Boolean function.
+    """
+    for cls, name in ((Not, 'not'), (And, 'and'), (Or, 'or'), (Xor, 'xor'), (Implies, 'implies'),
+                      (Equivalent, 'equivalent'), (Nand, 'nand'), (Nor, 'nor'), (Xnor, 'xnor'), (ITE, 'ite')):
+        if isinstance(expr, cls):
+            return name
+    raise TypeError(f"unsupported Boolean function: {type(expr).__name__}")
+
+
+def apply_instruction(op, a, shape):
+    """
+    Result of one program instruction on the packed uint64 arrays a
+    (shape is used for the constants 'true' and 'false').
+    """
+    if op == 'true':
+        return np.full(shape, _ALL, dtype=np.uint64)
+    if op == 'false':
+        return np.zeros(shape, dtype=np.uint64)
+    if op == 'not':
+        return ~a[0]
+    if op in ('and', 'nand'):
+        value = a[0] & a[1]
+        for x in a[2:]:
+            value &= x
+    elif op in ('or', 'nor', 'implies'):
+        value = (~a[0] if op == 'implies' else a[0]) | a[1]
+        for x in a[2:]:
+            value |= x
+    elif op in ('xor', 'xnor'):
+        value = a[0] ^ a[1]
+        for x in a[2:]:
+            value ^= x
+    elif op == 'equivalent':
+        both, neither = a[0].copy(), ~a[0]
+        for x in a[1:]:
+            both &= x
+            neither &= ~x
+        value = both | neither
+    elif op == 'ite':
+        value = (a[0] & a[1]) | (~a[0] & a[2])
+    if op in ('nand', 'nor', 'xnor'):
+        value = ~value
+    return value
+
+
+class CompiledFormula:
+    """
+    A sympy Boolean expression translated into a program of bitwise operations
+    on packed columns; shared subexpressions are evaluated only once.
+    """
+
+    def __init__(self, expr, variables=None):
+        if variables is None:
+            variables = sorted(expr.free_symbols, key=lambda s: s.name)
+        self.expr = expr
+        self.variables = list(variables)
+        missing = expr.free_symbols - set(self.variables)
+        if missing:
+            raise ValueError(f"variables missing for {sorted(s.name for s in missing)}")
+        # Programm in topologischer Reihenfolge: (Operation, Argumente als Slot-Indizes)
+        self.program = []
+        slots = {}
+        for variable in self.variables:
+            slots[variable] = len(self.program)
+            self.program.append(('variable', (self.variables.index(variable),)))
+        self.result = self._compile(expr, slots)
+        # nach der letzten Verwendung kann ein Zwischenergebnis freigegeben werden
+        self.last_use = {}
+        for i, (op, args) in enumerate(self.program):
+            for arg in args if op != 'variable' else ():
+                self.last_use[arg] = i
+
+    def _compile(self, expr, slots):
+        if expr in slots:
+            return slots[expr]
+        if isinstance(expr, BooleanTrue):
+            instruction = ('true', ())
+        elif isinstance(expr, BooleanFalse):
+            instruction = ('false', ())
+        elif isinstance(expr, Symbol):
+            raise ValueError(f"unknown variable {expr}")
+        else:
+            instruction = (_instruction(expr), tuple(self._compile(arg, slots) for arg in expr.args))
+        slots[expr] = len(self.program)
+        self.program.append(instruction)
+        return slots[expr]
+
+    @property
+    def num_rows(self):
+        return 1 << len(self.variables)
+
+    def _column(self, index, first_word, num_words):
+        """
+        Packed column of variable index for the words first_word .. first_word + num_words.
+        """
+        k = len(self.variables) - 1 - index  # Bit der Zeilennummer
+        if k < 6:
+            return np.full(num_words, _PATTERNS[k], dtype=np.uint64)
+        words = np.arange(first_word, first_word + num_words, dtype=np.uint64)
+        return np.where((words >> np.uint64(k - 6)) & np.uint64(1), _ALL, np.uint64(0))
+
+    def evaluate_words(self, first_word, num_words):
+        """
+        Packed result for the rows 64 · first_word .. 64 · (first_word + num_words):
+        bit b of word w is the value of row 64 · w + b.
+        """
+        values = [None] * len(self.program)
+        for i, (op, args) in enumerate(self.program):
+            if op == 'variable':
+                values[i] = self._column(args[0], first_word, num_words)
+                continue
+            values[i] = apply_instruction(op, [values[arg] for arg in args], num_words)
+            for arg in args:
+                if self.last_use[arg] == i and arg != self.result:
+                    values[arg] = None
+        result = values[self.result]
+        if self.num_rows < 64:
+            result = result & np.uint64((1 << self.num_rows) - 1)
+        return result
+
+    def packed(self, chunk_rows=1 << 22):
+        """
+        The complete result column packed into uint64 words (2ⁿ / 64 words).
+        """
+        return np.concatenate([words for _, words in self.iter_packed(chunk_rows)])
+
+    def iter_packed(self, chunk_rows=1 << 22):
+        """
+        Yields (first_row, words) for consecutive chunks of chunk_rows rows.
+        """
+        num_words = max(1, self.num_rows // 64)
+        chunk_words = max(1, chunk_rows // 64)
+        for first_word in range(0, num_words, chunk_words):
+            yield 64 * first_word, self.evaluate_words(first_word, min(chunk_words, num_words - first_word))
+
+    def iter_chunks(self, chunk_rows=1 << 16):
+        """
+        Yields (first_row, values) with a boolean array of the results for
+        consecutive chunks of chunk_rows rows.
+        """
+        for first_row, words in self.iter_packed(chunk_rows):
+            bits = np.unpackbits(words.astype('<u8', copy=False).view(np.uint8), bitorder='little').view(bool)
+            yield first_row, bits[:min(bits.size, self.num_rows - first_row)]
+
+    def rows(self, chunk_rows=1 << 16):
+        """
+        Yields the rows like sympy's truth_table: ([0, 1, ...], True/False).
+        """
+        n = len(self.variables)
+        shifts = np.arange(n - 1, -1, -1)
+        for first_row, values in self.iter_chunks(chunk_rows):
+            row_numbers = np.arange(first_row, first_row + values.size)
+            assignments = (row_numbers[:, None] >> shifts) & 1
+            yield from zip(assignments.tolist(), values.tolist())
+
+    def count(self):
+        """
+        Number of satisfying assignments (rows with value True).
+        """
+        return sum(int(np.bitwise_count(words).sum()) for _, words in self.iter_packed())
+
+    def minterms(self):
+        """
+        Row numbers of all satisfying assignments as int64 array.
+        """
+        return np.concatenate([np.flatnonzero(values) + first_row for first_row, values in self.iter_chunks(1 << 22)])
+
+
+def compile_formula(expr, variables=None):
+    """
+    Compiles expr for the variables (default: its free symbols sorted by name).
+    """
+    return CompiledFormula(expr, variables)
+
+
+def print_truth_table(expr, variables=None, file=None):
+    """
+    Prints the truth table of expr, one row per line like truth-table.py.
+    """
+    for assignment, value in compile_formula(expr, variables).rows():
+        print(f"({assignment}, {value})", file=file)
+
+
+def random_formula(num_variables, num_clauses=None, clause_size=3, seed=0):
+    """
+    Random formula in conjunctive normal form for the benchmark.
+    """
+    rng = np.random.default_rng(seed)
+    variables = symbols(f'x0:{num_variables}')
+    clauses = []
+    for _ in range(num_clauses or 2 * num_variables):
+        literals = rng.choice(num_variables, clause_size, replace=False)
+        clauses.append(Or(*(Not(variables[i]) if rng.random() < 0.5 else variables[i] for i in literals)))
+    return And(*clauses), list(variables)
+
+
+def benchmark(sizes=(8, 10, 12, 14), large=(20, 24, 28)):
+    """
+    Compares the compiled evaluation with sympy's truth_table for random
+    formulas, and shows the runtime for larger numbers of variables.
+    """
+    print("Benchmark: Wahrheitstabelle einer zufälligen KNF-Formel")
+    for n in sizes:
+        expr, variables = random_formula(n)
+        start = perf_counter()
+        reference = [(row, bool(value)) for row, value in truth_table(expr, variables)]
+        sympy_time = perf_counter() - start
+        start = perf_counter()
+        rows = list(compile_formula(expr, variables).rows())
+        compiled_time = perf_counter() - start
+        assert rows == reference
+        print(f"  {n:2d} Variablen: sympy {sympy_time:8.3f} s, kompiliert {compiled_time:7.3f} s "
+              f"(Faktor {sympy_time / compiled_time:.0f})")
+    for n in large:
+        expr, variables = random_formula(n)
+        start = perf_counter()
+        models = compile_formula(expr, variables).count()
+        print(f"  {n:2d} Variablen: {1 << n} Zeilen ausgewertet in {perf_counter() - start:.2f} s, "
+              f"{models} erfüllende Belegungen")
+
+
+if __name__ == '__main__':
+    A, B, C = symbols('A B C')
+    # Aussage 1: (¬A ∧ ¬B ∧ ¬C) ∨ (¬A ∧ ¬B ∧ C) ∨ (A ∧ B ∧ ¬C)
+    expr1 = Or(And(Not(A), Not(B), Not(C)), And(Not(A), Not(B), C), And(A, B, Not(C)))
+    print(f"WW-Tafel für Aussage {expr1}:")
+    print_truth_table(expr1, [A, B, C])
+    print()
+    benchmark()